@@ -4,7 +4,7 @@ from src.hybrid_summarizer import HybridSummarizer
 from src.evaluation import SummarizationEvaluator
 from src.question_answerer import get_question_answerer
 from utils.preprocessing import clean_text
-from utils.pdf_processor import PDFProcessor
+from utils.pdf_processor import pdf_processor
 from utils.multimodal_processor import MultimodalProcessor
 import time
 import os
@@ -27,7 +27,6 @@ app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'txt', 'mp3', 'wav', 'flac', 'm4a', '
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Initialize components
-pdf_processor = PDFProcessor()
 multimodal_processor = MultimodalProcessor()
 
 # Simple in-memory cache for summaries (LRU with max 10 entries)
@@ -165,9 +164,12 @@ def process_uploaded_file(file):
             # PDF processing
             logger.info(f"Processing PDF file: {filename}")
             
+            # Hash the upload once; validation, metadata and extraction all key on it
+            pdf_key = pdf_processor.content_key(filepath)
+
             # Validate the PDF file
             with open(filepath, 'rb') as file_handle:
-                is_valid, validation_message = pdf_processor.validate_pdf(file_handle)
+                is_valid, validation_message = pdf_processor.validate_pdf(file_handle, pdf_key)
 
             if not is_valid:
                 # Clean up invalid file
@@ -176,13 +178,13 @@ def process_uploaded_file(file):
 
             # Extract metadata
             with open(filepath, 'rb') as file_handle:
-                metadata = pdf_processor.get_pdf_metadata(file_handle)
+                metadata = pdf_processor.get_pdf_metadata(file_handle, pdf_key)
 
             logger.info(f"PDF metadata extracted: {metadata['pages']} pages, {metadata['title']}")
 
             # Extract text content
             with open(filepath, 'rb') as file_handle:
-                text = pdf_processor.extract_text_from_pdf(file_handle)
+                text = pdf_processor.extract_text_from_pdf(file_handle, pdf_key)
 
             if not text or len(text.strip()) < 50:
                 os.remove(filepath)
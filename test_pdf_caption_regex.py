@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the PDF figure/table caption cleanup
+Checks that caption removal, as run by PDF post-processing, stays fast on
+pathological input and still removes captions
+"""
+
+import time
+from utils.pdf_processor import PDFProcessor, _RE_CAPTION
+
+# Generous bound; the bounded pattern takes around 0.1 s on 1 MB, and the
+# whole post-processing pipeline under 1 s
+MAX_SECONDS = 2.0
+INPUT_SIZE = 1024 * 1024
+
+def _pathological_inputs():
+    """1 MB inputs with no newlines, which an unbounded caption pattern scans to the end for every candidate"""
+    return {
+        'long line after a caption': "Figure 1: " + "x" * INPUT_SIZE,
+        'back-to-back captions': ("Table 1: " * (INPUT_SIZE // 9)),
+        'caption keywords without numbers': ("Fig. " * (INPUT_SIZE // 5)),
+        'caption keywords separated by text': ("see table 12 and " * (INPUT_SIZE // 17)),
+    }
+
+def test_caption_regex_speed():
+    """Caption removal finishes quickly on 1 MB pathological inputs"""
+    print("Testing caption regex on pathological input...")
+    processor = PDFProcessor()
+
+    for name, text in _pathological_inputs().items():
+        start_time = time.time()
+        _RE_CAPTION.sub('', text)
+        regex_time = time.time() - start_time
+
+        start_time = time.time()
+        processor._post_process_pdf_text(text, extractor='pypdf2')
+        clean_time = time.time() - start_time
+
+        print(f"  {name}: regex {regex_time:.3f}s, post-processing {clean_time:.3f}s")
+        assert regex_time < MAX_SECONDS, f"caption regex took {regex_time:.2f}s on '{name}'"
+        assert clean_time < MAX_SECONDS, f"post-processing took {clean_time:.2f}s on '{name}'"
+
+def test_caption_removed():
+    """A caption line is removed while the text around it is kept"""
+    print("Testing caption removal...")
+    processor = PDFProcessor()
+
+    text = ("Results are summarised below.\n"
+            "Figure 3: Accuracy of each model on the test set\n"
+            "The second model performs best overall.")
+    cleaned = processor._post_process_pdf_text(text, extractor='pypdf2')
+    print(f"  Cleaned: {cleaned!r}")
+
+    assert "Accuracy of each model" not in cleaned, "caption was not removed"
+    assert "Results are summarised below." in cleaned, "text before the caption was removed"
+    assert "The second model performs best overall." in cleaned, "text after the caption was removed"
+
+def main():
+    """Run all caption regex tests"""
+    print("Caption Regex Test Suite")
+    print("=" * 50)
+
+    test_results = []
+    for test_name, test in [("Caption Regex Speed", test_caption_regex_speed),
+                            ("Caption Removal", test_caption_removed)]:
+        try:
+            test()
+            test_results.append((test_name, True))
+        except AssertionError as e:
+            print(f"  Failed: {e}")
+            test_results.append((test_name, False))
+
+    print("\n" + "=" * 50)
+    passed = sum(1 for _, result in test_results if result)
+    for test_name, result in test_results:
+        print(f"{test_name}: {'PASSED' if result else 'FAILED'}")
+    print(f"\nOverall: {passed}/{len(test_results)} tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the Hyperscan regex prefilter
+Checks that a scan which every gated pattern matches ends cleanly, with the
+real hyperscan library when it is installed and a stand-in that raises like
+it otherwise
+"""
+
+import re
+import utils.regex_prefilter as regex_prefilter
+import utils.pdf_processor as pdf_processor
+import utils.preprocessing as preprocessing
+from utils.regex_prefilter import RegexPrefilter
+from utils.pdf_processor import PDFProcessor
+from utils.preprocessing import clean_text
+
+# Raw extracted text that hits every post-processing pattern
+ACADEMIC_TEXT = ("Header line Introduction here\n"
+                 "A 1 test [2] (Smith et al., 2020) word , x\n 12 \n\n\n\n"
+                 "Figure 3 cap, published (2021).\n"
+                 "Results end here.\nThe next line starts a sentence.\n"
+                 "Multi-\nline text. Next sentence.More text follows\n"
+                 "• bullet point and value0 or word1l\n"
+                 "1. Numbered conclusion here.\n")
+
+# Raw PDF-style text that hits every text cleaning pattern
+RAW_TEXT = ("Header line Introduction here\n"
+            "A 1 test [2] (Smith et al., 2020) word , x\n 12 \n\n\n\n"
+            "Figure 3 cap\n"
+            "more text.")
+
+
+class _ScanTerminated(Exception):
+    pass
+
+
+class _TerminatingDatabase:
+    """Behaves like hyperscan.Database.scan: a truthy callback return raises ScanTerminated"""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+    def scan(self, data, match_event_handler):
+        text = data.decode('utf-8')
+        for pattern_id, pattern in enumerate(self.patterns):
+            if pattern.search(text) and match_event_handler(pattern_id, 0, 0, 0, None):
+                raise _ScanTerminated("error code -3")
+
+
+def _prefilter(patterns):
+    """A RegexPrefilter over patterns, backed by real Hyperscan if available"""
+    return _ensure_database(RegexPrefilter(patterns, name='test'), patterns)
+
+def _ensure_database(prefilter, patterns):
+    """Back prefilter with the stand-in database when real Hyperscan is not installed"""
+    if not prefilter.pattern_ids:
+        if not regex_prefilter.HAS_HYPERSCAN:
+            class _hyperscan:
+                ScanTerminated = _ScanTerminated
+            regex_prefilter.hyperscan = _hyperscan
+        prefilter.database = _TerminatingDatabase(patterns)
+        prefilter.pattern_ids = {pattern: pattern_id for pattern_id, pattern in enumerate(patterns)}
+    return prefilter
+
+def test_scan_stops_early():
+    """A scan that every pattern matches returns all of them instead of raising"""
+    print("Testing prefilter scan when every pattern matches...")
+    print(f"  Real Hyperscan: {regex_prefilter.HAS_HYPERSCAN}")
+    patterns = (re.compile(r'\[\d+\]'), re.compile(r'Figure'), re.compile(r'\n\s*\d+\s*\n'))
+    prefilter = _prefilter(patterns)
+
+    hits = prefilter.scan("See [1] and Figure 2\n 12 \nmore")
+    assert hits == frozenset(prefilter.pattern_ids.values()), f"unexpected hits {sorted(hits)}"
+
+    gate = prefilter.gate()
+    assert gate.sub(patterns[0], '', "See [1] and Figure 2\n 12 \nmore") == "See  and Figure 2\n 12 \nmore"
+    assert not gate.may_match(patterns[1], "no match here")
+
+def test_gate_keeps_python_matches():
+    """The gate never rules out a pattern that Python's re matches"""
+    print("Testing that the prefilter never skips a matching pass...")
+    # ASCII separators Python treats as whitespace, and a Unicode 11 letter
+    # that Hyperscan's older tables do not count as a word character
+    texts = ["sections\n  \x1c?\n- 1", "a\x1f, b", "word \u05600 end", "\u0560l here [3]"]
+    for prefilter, patterns in ((pdf_processor._PREFILTER, pdf_processor._POST_PROCESS_PATTERNS),
+                                (preprocessing._PREFILTER, list(preprocessing._PREFILTER.pattern_ids))):
+        for text in texts:
+            gate = prefilter.gate()
+            for pattern in patterns:
+                if pattern.search(text):
+                    assert gate.may_match(pattern, text), f"{pattern.pattern!r} skipped on {text!r}"
+
+def test_pdf_post_processing():
+    """PDF post-processing succeeds on text that hits every gated pattern"""
+    print("Testing PDF post-processing on academic text...")
+    _ensure_database(pdf_processor._PREFILTER, pdf_processor._POST_PROCESS_PATTERNS)
+    processor = PDFProcessor()
+
+    text = processor._post_process_pdf_text(ACADEMIC_TEXT, extractor='pypdf2')
+    print(f"  Result: {text!r}")
+    assert "Introduction here" in text, "post-processing lost the text"
+    assert "[2]" not in text, "citation marker was not removed"
+
+def test_clean_text():
+    """Text cleaning succeeds on raw text that hits every gated pattern"""
+    print("Testing clean_text on raw PDF-style text...")
+    _ensure_database(preprocessing._PREFILTER, (
+        preprocessing._RE_OCR_CHAR, preprocessing._RE_PAGENUM, preprocessing._RE_HEADER,
+        preprocessing._RE_CITATION, preprocessing._RE_ET_AL, preprocessing._RE_CAPTION,
+        preprocessing._RE_BLANK_LINES, preprocessing._RE_SPACE_BEFORE_PUNCT,
+    ))
+
+    text = clean_text(RAW_TEXT)
+    print(f"  Result: {text!r}")
+    assert text == 'Introduction here\nA I test word, x\nmore text.', "unexpected cleaned text"
+
+def main():
+    """Run all prefilter tests"""
+    print("Regex Prefilter Test Suite")
+    print("=" * 50)
+
+    test_results = []
+    for test_name, test in [("Prefilter Scan", test_scan_stops_early),
+                            ("Gate Soundness", test_gate_keeps_python_matches),
+                            ("PDF Post-processing", test_pdf_post_processing),
+                            ("Text Cleaning", test_clean_text)]:
+        try:
+            test()
+            test_results.append((test_name, True))
+        except Exception as e:
+            print(f"  Failed: {type(e).__name__}: {e}")
+            test_results.append((test_name, False))
+
+    print("\n" + "=" * 50)
+    passed = sum(1 for _, result in test_results if result)
+    for test_name, result in test_results:
+        print(f"{test_name}: {'PASSED' if result else 'FAILED'}")
+    print(f"\nOverall: {passed}/{len(test_results)} tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import os
+import mmap
+import hashlib
+import logging
+import tempfile
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# BLAKE3's SIMD tree hash runs at several GB/s and can spread one large input
+# across cores; stdlib BLAKE2b is the fallback
+try:
+    from blake3 import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_DIGEST_SIZE = 16
+# Default bound on the cache directory; least recently used entries go first
+_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _new_hasher():
+    if HAS_BLAKE3:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.blake2b(digest_size=_DIGEST_SIZE)
+
+
+def _hexdigest(hasher) -> str:
+    if HAS_BLAKE3:
+        return hasher.hexdigest(length=_DIGEST_SIZE)
+    return hasher.hexdigest()
+
+
+def hash_source(source) -> Optional[str]:
+    """
+    Hex digest of a file path, in-memory buffer or seekable binary stream
+
+    Streams are hashed from the start and left at their original position.
+    Returns None for sources that cannot be read without consuming them.
+    """
+    hasher = _new_hasher()
+
+    if isinstance(source, str):
+        if hasattr(hasher, 'update_mmap'):
+            hasher.update_mmap(source)
+        else:
+            with open(source, 'rb') as f:
+                _update_from_stream(hasher, f)
+    elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        hasher.update(source)
+    else:
+        try:
+            if hasattr(source, 'seekable') and not source.seekable():
+                return None
+            position = source.tell()
+            source.seek(0)
+        except (AttributeError, OSError, ValueError):
+            return None
+        try:
+            _update_from_stream(hasher, source)
+        finally:
+            source.seek(position)
+
+    return _hexdigest(hasher)
+
+
+def _update_from_stream(hasher, stream):
+    """Feed a binary stream into a hash in fixed-size chunks"""
+    if not hasattr(stream, 'readinto'):
+        for chunk in iter(lambda: stream.read(_HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+        return
+
+    # One reusable buffer instead of a fresh bytes object per chunk
+    buffer = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        read = stream.readinto(buffer)
+        if not read:
+            break
+        hasher.update(view[:read])
+
+
+class ExtractCache:
+    """
+    On-disk cache of extracted text, keyed by the content hash of the input file
+
+    The directory is bounded in size: entries are touched on every hit and the
+    least recently used (oldest mtime) are deleted once a write takes the
+    total over max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Cache directory; defaults to $EXTRACT_CACHE or
+                <tmp>/extract_cache
+            max_bytes: Size bound for the directory; defaults to
+                $EXTRACT_CACHE_MAX_BYTES or 512 MiB
+        """
+        self.cache_dir = cache_dir or os.environ.get('EXTRACT_CACHE') or os.path.join(tempfile.gettempdir(), 'extract_cache')
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('EXTRACT_CACHE_MAX_BYTES', _DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.enabled = True
+        except OSError as e:
+            logger.warning(f"Extraction cache disabled - cannot create {self.cache_dir}: {e}")
+            self.enabled = False
+
+    def key(self, source, namespace: str, digest: Optional[str] = None) -> Optional[str]:
+        """
+        Cache key for a source, or None if caching is unavailable for it
+
+        The namespace separates results that depend on more than the file
+        content, e.g. the speech-to-text model used, and should change
+        whenever the pipeline producing the text does. A caller that already
+        has hash_source(source) passes it as digest to skip hashing again.
+        """
+        if not self.enabled:
+            return None
+        if digest is None:
+            try:
+                digest = hash_source(source)
+            except OSError as e:
+                logger.warning(f"Could not hash input for the extraction cache: {e}")
+                return None
+        return f"{namespace}-{digest}" if digest else None
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """Return cached text for key, or None on a miss"""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read extraction cache entry {key}: {e}")
+            return None
+        try:
+            # Mark the entry as recently used so eviction keeps it
+            os.utime(path)
+        except OSError:
+            pass
+        logger.info(f"Extraction cache hit: {key}")
+        return text
+
+    def put(self, key: Optional[str], text: str):
+        """Store text under key; the entry appears atomically or not at all"""
+        if key is None:
+            return
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.cache_dir,
+                                             suffix='.tmp', delete=False) as f:
+                temp_path = f.name
+                f.write(text)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {key}: {e}")
+            if temp_path:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return
+        self._evict()
+
+    def _evict(self):
+        """Delete the least recently used entries until the directory fits in max_bytes"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.txt'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            logger.warning(f"Could not scan extraction cache {self.cache_dir}: {e}")
+            return
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict extraction cache entry {path}: {e}")
+                continue
+            total -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.txt')
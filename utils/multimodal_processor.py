@@ -1,30 +1,213 @@
 import os
+import re
+import gc
+import sys
 import logging
-from typing import Optional, Dict, Any, Tuple
+import json
+import atexit
+import shutil
+import queue
+import asyncio
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Union, BinaryIO
 import tempfile
 import subprocess
 
+from .extract_cache import ExtractCache
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Subtitle cue text: everything after a timing line up to the next blank line.
+# Works for both SRT (numbered cues) and WebVTT (optional cue identifiers).
+_CUE_TEXT_RE = re.compile(r'^[^\n]*-->[^\n]*\n(.*?)(?=\n[ \t]*\n|\Z)', re.DOTALL | re.MULTILINE)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_CONTROL_CHARS_TO_SPACE = str.maketrans({c: ' ' for c in range(32) if c not in (9, 10, 13)})
+# e.g. "Stream #0:2(eng): Subtitle: mov_text" or "Stream #0:3[0x1100]: Subtitle: ..."
+_FFMPEG_SUBTITLE_STREAM_RE = re.compile(r'Stream #\d+:(\d+)\S*: Subtitle:')
+
+# Whisper consumes 16 kHz mono audio in fixed 30-second windows
+_WHISPER_SAMPLE_RATE = 16000
+_WHISPER_WINDOW_SECONDS = 30
+# ISO-BMFF containers may keep their index (moov atom) after the media data,
+# so ffmpeg needs a seekable file rather than a pipe to demux them
+_SEEKABLE_INPUT_EXTENSIONS = frozenset({'.mp4', '.m4a', '.mov'})
+_STDIN_COPY_BUFSIZE = 1024 * 1024
+# Drops every pause longer than half a second below -40 dBFS during decoding
+_SILENCE_REMOVE_FILTER = 'silenceremove=stop_periods=-1:stop_duration=0.5:stop_threshold=-40dB'
+# Concurrent CTranslate2 workers (and inference slots) for faster-whisper on CUDA,
+# so one job's host-side work overlaps another's GPU encoder pass
+_CUDA_WHISPER_WORKERS = 2
+# Seekable uploads up to this size are held in an in-memory file rather than on disk
+_MAX_IN_MEMORY_UPLOAD = 64 * 1024 * 1024
+
+# Companion subtitle files, in order of preference
+_SUBTITLE_EXTENSION_ORDER = ('.srt', '.vtt', '.ass', '.ssa', '.sub', '.sbv')
+_SUBTITLE_EXTENSIONS = frozenset(_SUBTITLE_EXTENSION_ORDER)
+_SUBTITLE_LANGUAGE_CODES = ('.en', '.eng', '.english', '.es', '.fr', '.de', '.it', '.pt', '.ru', '.ja', '.ko', '.zh')
+_MAX_COMPANION_SCAN_ENTRIES = 10000
+
+# Supported extension -> media kind
+_EXT_KIND = {
+    '.mp3': 'audio', '.wav': 'audio', '.flac': 'audio', '.m4a': 'audio', '.aac': 'audio', '.ogg': 'audio',
+    '.mp4': 'video', '.avi': 'video', '.mov': 'video', '.mkv': 'video', '.webm': 'video', '.flv': 'video',
+}
+
+# Leading magic bytes -> media kind they identify ('any' = audio or video container)
+_HEADER_MAGIC = {
+    b'ID3': 'audio',               # MP3 with ID3v2 tag
+    b'\xff\xfb': 'audio',          # MP3 frame sync (MPEG-1 Layer III)
+    b'\xff\xf3': 'audio',          # MP3 frame sync (MPEG-2 Layer III)
+    b'\xff\xf2': 'audio',          # MP3 frame sync (MPEG-2.5 Layer III)
+    b'\xff\xf1': 'audio',          # AAC ADTS (MPEG-4)
+    b'\xff\xf9': 'audio',          # AAC ADTS (MPEG-2)
+    b'RIFF': 'any',                # WAV or AVI
+    b'fLaC': 'audio',
+    b'OggS': 'audio',
+    b'\x1a\x45\xdf\xa3': 'video',  # EBML header: Matroska (MKV) and WebM
+    b'FLV': 'video',
+}
+_HEADER_MAGIC_LENGTHS = sorted({len(magic) for magic in _HEADER_MAGIC}, reverse=True)
+
+
+def _decode_subtitle_bytes(raw: bytes) -> str:
+    """Decode subtitle bytes in one pass, honouring UTF-8/UTF-16 byte order marks"""
+    if raw.startswith(b'\xef\xbb\xbf'):
+        encoding = 'utf-8-sig'
+    elif raw[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        encoding = 'utf-16'
+    else:
+        encoding = 'utf-8'
+    return raw.decode(encoding, errors='replace')
+
+
+@lru_cache(maxsize=64)
+def _list_directory_files(directory: str, mtime_ns: int) -> Optional[Tuple[str, ...]]:
+    """
+    Names of the regular files in a directory, or None if it is too large to scan
+
+    Keyed on the directory's mtime so videos processed from the same folder share
+    one scan, while adding or removing a file invalidates the entry.
+    """
+    filenames = []
+    with os.scandir(directory) as entries:
+        for count, entry in enumerate(entries, 1):
+            if count > _MAX_COMPANION_SCAN_ENTRIES:
+                return None
+            if entry.is_file():
+                filenames.append(entry.name)
+    return tuple(filenames)
+
+
+@lru_cache(maxsize=256)
+def _probe_duration(ffprobe: str, file_path: str, mtime_ns: int) -> Optional[float]:
+    """Read a media file's container duration with ffprobe, cached per file version"""
+    return _ffprobe_duration(ffprobe, file_path)
+
+
+def _ffprobe_duration(ffprobe: str, file_path: str) -> Optional[float]:
+    """Read a media file's container duration with ffprobe"""
+    cmd = [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nk=1:nw=1', file_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+    if result.returncode != 0:
+        return None
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None  # "N/A" when the container does not record a duration
+
+
+@lru_cache(maxsize=8)
+def _ffmpeg_has_filter(ffmpeg: str, name: str) -> bool:
+    """Whether an ffmpeg build includes an audio/video filter, checked once per binary"""
+    try:
+        result = subprocess.run([ffmpeg, '-hide_banner', '-filters'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+
+@lru_cache(maxsize=256)
+def _file_extension(filename: str) -> str:
+    """Lowercased extension of a filename, cached for the repeated per-upload checks"""
+    return os.path.splitext(filename.lower())[1]
+
+
 class MultimodalProcessor:
     """Processor for audio and video files to extract text using speech-to-text"""
 
-    def __init__(self):
-        self.supported_audio_formats = {'.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg'}
-        self.supported_video_formats = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv'}
+    def __init__(self, max_cached_models: int = 1):
+        """
+        Args:
+            max_cached_models: Whisper models kept loaded between jobs (LRU);
+                0 releases the model as soon as each job finishes
+        """
+        self.supported_audio_formats = {ext for ext, kind in _EXT_KIND.items() if kind == 'audio'}
+        self.supported_video_formats = {ext for ext, kind in _EXT_KIND.items() if kind == 'video'}
+        # Serializes Whisper inference: concurrent requests (e.g. via the async
+        # wrappers) still overlap decoding and I/O, but a single GPU gains
+        # nothing from running several transcriptions at once
+        self._inference_slots = threading.BoundedSemaphore(1)
+        self.max_cached_models = max_cached_models
+        self._models = OrderedDict()
+        # Cache key -> BatchedInferencePipeline wrapping the cached faster-whisper model
+        self._batched_pipelines = {}
+        self._models_lock = threading.Lock()
+        # Silero VAD: None until first use, False if it could not be loaded
+        self._vad = None
+        self._vad_lock = threading.Lock()
+        self._cache = ExtractCache()
         self._check_dependencies()
+        # Free (V)RAM held by cached models on interpreter shutdown
+        atexit.register(self._release_cached_models)
 
     def _check_dependencies(self):
         """Check if required dependencies are available"""
+        # Prefer whisper.cpp: its GGML weights are mmapped, so a cold start loads
+        # the model in milliseconds instead of unpickling PyTorch tensors.
+        # Next best is faster-whisper (CTranslate2 int8 kernels), then the
+        # reference PyTorch implementation.
+        self.whisper_backend = None
+        self.whisper_device = 'cpu'
+        self.batched_inference_available = False
         try:
-            import whisper
-            self.whisper_available = True
-            logger.info("OpenAI Whisper available for speech-to-text")
+            import pywhispercpp.model
+            self.whisper_backend = 'whisper.cpp'
+            logger.info("whisper.cpp (pywhispercpp) available for speech-to-text")
         except ImportError:
-            self.whisper_available = False
-            logger.warning("OpenAI Whisper not available - speech-to-text disabled")
+            pass
+
+        if self.whisper_backend is None:
+            try:
+                from faster_whisper import WhisperModel
+                self.whisper_backend = 'faster-whisper'
+                if self._cuda_available():
+                    self.whisper_device = 'cuda'
+                    self._inference_slots = threading.BoundedSemaphore(_CUDA_WHISPER_WORKERS)
+                logger.info(f"faster-whisper available for speech-to-text ({self.whisper_device})")
+                from faster_whisper import BatchedInferencePipeline
+                self.batched_inference_available = True
+            except ImportError:
+                pass  # Batched inference needs faster-whisper >= 1.1
+
+        if self.whisper_backend is None:
+            try:
+                import whisper
+                import torch
+                self.whisper_backend = 'openai-whisper'
+                if torch.cuda.is_available():
+                    self.whisper_device = 'cuda'
+                logger.info(f"OpenAI Whisper available for speech-to-text ({self.whisper_device})")
+                self._configure_torch_matmul()
+            except ImportError:
+                logger.warning("OpenAI Whisper not available - speech-to-text disabled")
+
+        self.whisper_available = self.whisper_backend is not None
 
         try:
             # Try new import path first (moviepy 2.x)
@@ -41,31 +224,72 @@ class MultimodalProcessor:
             self.moviepy_available = False
             logger.warning("MoviePy not available - video processing disabled")
 
+        # Resolve FFmpeg once - imageio-ffmpeg ships a bundled binary, which
+        # takes a filesystem probe to locate on every get_ffmpeg_exe() call
+        try:
+            import imageio_ffmpeg
+            self._ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+            logger.info(f"Using FFmpeg from: {self._ffmpeg_path}")
+        except Exception as e:
+            self._ffmpeg_path = None
+            logger.warning(f"imageio-ffmpeg not available - embedded caption extraction disabled: {e}")
+
+        # imageio-ffmpeg does not bundle ffprobe, so only a system install is used
+        self._ffprobe_path = shutil.which('ffprobe')
+
+    def _cuda_available(self) -> bool:
+        """True if CTranslate2 (or, failing that, PyTorch) can see a CUDA device"""
+        try:
+            import ctranslate2
+            return ctranslate2.get_cuda_device_count() > 0
+        except Exception:
+            pass
+        try:
+            import torch
+            return torch.cuda.is_available()
+        except Exception:
+            return False
+
+    def _configure_torch_matmul(self):
+        """Allow TF32 matmuls for PyTorch Whisper (~2x GEMM throughput on Ampere+ GPUs)"""
+        try:
+            import torch
+            torch.set_float32_matmul_precision('high')
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+        except Exception as e:
+            logger.warning(f"Could not configure PyTorch matmul precision: {e}")
+
     def is_supported_file(self, filename: str) -> bool:
         """Check if the file format is supported"""
         if not filename:
             return False
 
-        _, ext = os.path.splitext(filename.lower())
-        return ext in self.supported_audio_formats or ext in self.supported_video_formats
+        return self._classify(filename) is not None
 
     def is_audio_file(self, filename: str) -> bool:
         """Check if file is an audio file"""
-        _, ext = os.path.splitext(filename.lower())
-        return ext in self.supported_audio_formats
+        return self._classify(filename) == 'audio'
 
     def is_video_file(self, filename: str) -> bool:
         """Check if file is a video file"""
-        _, ext = os.path.splitext(filename.lower())
-        return ext in self.supported_video_formats
+        return self._classify(filename) == 'video'
 
-    def extract_text_from_audio_video(self, file_path: str, model_size: str = "base") -> str:
+    def _classify(self, filename: str) -> Optional[str]:
+        """Return 'audio', 'video' or None for unsupported files"""
+        return _EXT_KIND.get(_file_extension(filename))
+
+    def extract_text_from_audio_video(self, file_path: Union[str, BinaryIO], model_size: str = "base",
+                                      batch_size: int = 8) -> str:
         """
         Extract text from audio/video file using Whisper
 
         Args:
-            file_path: Path to the audio/video file
+            file_path: Path to the audio/video file, or a readable binary stream
+                that is piped into ffmpeg
             model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+            batch_size: 30 s windows transcribed together in one batched forward
+                pass (faster-whisper >= 1.1 only; 1 disables batching)
 
         Returns:
             Extracted text content
@@ -73,45 +297,389 @@ class MultimodalProcessor:
         if not self.whisper_available:
             raise Exception("OpenAI Whisper not installed. Please install with: pip install openai-whisper")
 
-        try:
-            import whisper
-            
-            # Configure FFmpeg path for Whisper
-            # Whisper uses ffmpeg-python which looks for ffmpeg in PATH
-            # Use imageio-ffmpeg's bundled ffmpeg if system ffmpeg not available
-            try:
-                import imageio_ffmpeg
-                ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-                # Add ffmpeg directory to PATH temporarily
-                ffmpeg_dir = os.path.dirname(ffmpeg_path)
-                old_path = os.environ.get('PATH', '')
-                os.environ['PATH'] = f"{ffmpeg_dir}{os.pathsep}{old_path}"
-                logger.info(f"Using FFmpeg from: {ffmpeg_path}")
-            except Exception as e:
-                logger.warning(f"Could not configure imageio-ffmpeg: {e}")
-                # Continue anyway, maybe system ffmpeg is available
-
-            logger.info(f"Loading Whisper model: {model_size}")
-            model = whisper.load_model(model_size)
+        # Transcripts depend on the backend and model as well as the content
+        cache_key = self._cache.key(file_path, f"{self.whisper_backend}-{model_size}")
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
+        try:
             logger.info(f"Transcribing file: {file_path}")
-            result = model.transcribe(file_path, language='en')
+            try:
+                text = self._transcribe_streaming(file_path, model_size, batch_size)
+            finally:
+                if self.max_cached_models < 1:
+                    self._release_model_memory()
 
-            text = result["text"].strip()
             if not text:
                 raise Exception("No speech detected in the audio/video file")
 
             logger.info(f"Successfully extracted {len(text)} characters of text")
+            self._cache.put(cache_key, text)
             return text
 
         except Exception as e:
             logger.error(f"Error during speech-to-text: {e}")
             raise Exception(f"Speech-to-text failed: {str(e)}")
 
+    def _get_whisper_model(self, model_size: str):
+        """Return a cached Whisper model, evicting the least recently used one if needed"""
+        # Held across the load so concurrent requests (Flask's threaded server)
+        # wait for the first load instead of each loading their own copy
+        key = (model_size, self.whisper_device)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+
+            # Evict before loading so the old and new models never coexist in (V)RAM
+            if self._models and len(self._models) >= self.max_cached_models:
+                while self._models and len(self._models) >= self.max_cached_models:
+                    evicted_key, _ = self._models.popitem(last=False)
+                    self._batched_pipelines.pop(evicted_key, None)
+                    logger.info(f"Evicting cached Whisper model: {evicted_key[0]} ({evicted_key[1]})")
+                self._release_model_memory()
+
+            logger.info(f"Loading Whisper model: {model_size} ({self.whisper_backend}, {self.whisper_device})")
+            model = self._load_whisper_model(model_size)
+            if self.max_cached_models > 0:
+                self._models[key] = model
+                if self.whisper_backend == 'faster-whisper' and self.batched_inference_available:
+                    from faster_whisper import BatchedInferencePipeline
+                    self._batched_pipelines[key] = BatchedInferencePipeline(model=model)
+            return model
+
+    def _batched_pipeline(self, model):
+        """Return the BatchedInferencePipeline for a faster-whisper model, reusing the cached one if it has one"""
+        with self._models_lock:
+            for pipeline in self._batched_pipelines.values():
+                if pipeline.model is model:
+                    return pipeline
+        # The model is not cached (max_cached_models=0), so it lives for one job only
+        from faster_whisper import BatchedInferencePipeline
+        return BatchedInferencePipeline(model=model)
+
+    def _release_cached_models(self):
+        """Drop every cached model and free the memory it held"""
+        with self._models_lock:
+            self._models.clear()
+            self._batched_pipelines.clear()
+        self._release_model_memory()
+
+    def _release_model_memory(self):
+        """Free memory held by dropped models right away instead of at the next GC"""
+        gc.collect()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _load_whisper_model(self, model_size: str):
+        """Load a Whisper model for the active backend"""
+        if self.whisper_backend == 'whisper.cpp':
+            from pywhispercpp.model import Model
+
+            # English-only GGML weights; 'large' has no .en variant
+            model_name = 'large-v3' if model_size.startswith('large') else f"{model_size}.en"
+            # Downloaded weights persist in models_dir across restarts
+            return Model(model_name, models_dir=os.environ.get('WHISPER_CPP_MODELS_DIR'),
+                         n_threads=os.cpu_count() or 1, print_progress=False, print_realtime=False)
+
+        if self.whisper_backend == 'faster-whisper':
+            from faster_whisper import WhisperModel
+
+            if self.whisper_device == 'cuda':
+                # FP16 GEMMs run on tensor cores via cuBLAS
+                return WhisperModel(model_size, device='cuda', compute_type='float16',
+                                    num_workers=_CUDA_WHISPER_WORKERS)
+            # int8 weights run on CTranslate2's VNNI/AVX int8 GEMM kernels
+            return WhisperModel(model_size, device='cpu', compute_type='int8', cpu_threads=os.cpu_count() or 0)
+
+        import torch
+        import whisper
+
+        if self.whisper_device != 'cuda':
+            return whisper.load_model(model_size, device='cpu')
+
+        # FP16 weights halve memory traffic; compiling the encoder (the dominant
+        # FLOP cost, with a fixed 30 s input shape) fuses its elementwise ops.
+        # The decoder is left eager because Whisper drives it through kv-cache hooks.
+        model = whisper.load_model(model_size, device='cuda').half()
+        try:
+            model.encoder = torch.compile(model.encoder, mode='reduce-overhead')
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, using eager Whisper encoder: {e}")
+        return model
+
+    def _transcribe_window(self, model, audio, batch_size: int = 1, pipeline=None, vad_filter: bool = True) -> str:
+        """
+        Transcribe 16 kHz float32 audio (batch_size windows long) with the active backend
+
+        pipeline is model's BatchedInferencePipeline, used by faster-whisper when
+        batch_size > 1. vad_filter runs faster-whisper's own VAD on unbatched
+        windows; it is redundant once ffmpeg has trimmed the silence.
+        """
+        if self.whisper_backend == 'whisper.cpp':
+            segments = model.transcribe(audio)
+            return ''.join(segment.text for segment in segments).strip()
+
+        if self.whisper_backend == 'faster-whisper':
+            if batch_size > 1:
+                if pipeline is None:
+                    pipeline = self._batched_pipeline(model)
+                # Splits the audio into <= 30 s chunks and encodes them as one batch
+                segments, _ = pipeline.transcribe(audio, language='en', beam_size=1, batch_size=batch_size)
+            else:
+                segments, _ = model.transcribe(audio, language='en', vad_filter=vad_filter, beam_size=1)
+            # Segments are decoded lazily, so the join is where inference happens
+            return ''.join(segment.text for segment in segments).strip()
+
+        import torch
+
+        # No autograd bookkeeping for pure inference
+        with torch.inference_mode():
+            result = model.transcribe(audio, language='en', fp16=model.device.type == 'cuda')
+        return result["text"].strip()
+
+    async def aextract_text_from_audio_video(self, file_path: str, model_size: str = "base",
+                                             batch_size: int = 8) -> str:
+        """
+        Async variant of extract_text_from_audio_video for use from an event loop
+
+        The blocking transcription runs on the default executor via
+        asyncio.to_thread, so the pool size bounds concurrent jobs.
+        """
+        return await asyncio.to_thread(self.extract_text_from_audio_video, file_path, model_size, batch_size)
+
+    def _transcribe_streaming(self, file_path: Union[str, BinaryIO], model_size: str, batch_size: int = 1) -> str:
+        """
+        Transcribe audio window by window while ffmpeg keeps decoding ahead
+
+        Decoding and silence removal run on a background thread feeding a
+        bounded queue, so that work overlaps with Whisper inference instead of
+        preceding it. The model loads on a third thread meanwhile; it is only
+        waited for once the first voiced window arrives, so silent uploads
+        return without blocking on it.
+        """
+        if not self.batched_inference_available:
+            batch_size = 1
+        # Back-pressure: decode at most one batch (and at least two windows) ahead
+        windows = queue.Queue(maxsize=max(2, batch_size))
+        stop = threading.Event()
+        decode_errors = []
+
+        # Trim silence inside the ffmpeg decode pass when the build supports it;
+        # Silero VAD over the decoded windows is the fallback
+        trim_in_ffmpeg = _ffmpeg_has_filter(self._ffmpeg_path or 'ffmpeg', 'silenceremove')
+
+        def decode():
+            decoded = audio = None
+            try:
+                decoded = self._decode_audio_windows(file_path, trim_silence=trim_in_ffmpeg)
+                audio = decoded if trim_in_ffmpeg else self._voiced_windows(decoded)
+                for window in audio:
+                    while not stop.is_set():
+                        try:
+                            windows.put(window, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                decode_errors.append(e)
+            finally:
+                if audio is not None:
+                    audio.close()
+                if decoded is not None:
+                    decoded.close()  # Kills ffmpeg if transcription stopped early
+                windows.put(None)
+
+        decoder = threading.Thread(target=decode, name="whisper-decode", daemon=True)
+        decoder.start()
+
+        # Overlap the (cached or cold) model load with ffmpeg start-up and VAD
+        loader = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-load")
+        model_future = loader.submit(self._get_whisper_model, model_size)
+        loader.shutdown(wait=False)
+
+        model = pipeline = None
+        texts = []
+        batch = []
+        try:
+            while True:
+                window = windows.get()
+                if window is not None:
+                    batch.append(window)
+                if batch and (window is None or len(batch) >= batch_size):
+                    if model is None:
+                        model = model_future.result()
+                        if batch_size > 1 and self.whisper_backend == 'faster-whisper':
+                            pipeline = self._batched_pipeline(model)
+                    if len(batch) > 1:
+                        import numpy as np
+                        audio = np.concatenate(batch)
+                    else:
+                        audio = batch[0]
+                    with self._inference_slots:
+                        texts.append(self._transcribe_window(model, audio, len(batch), pipeline,
+                                                             vad_filter=not trim_in_ffmpeg))
+                    batch = []
+                if window is None:
+                    break
+        finally:
+            stop.set()
+            # Unblock the decoder if it is waiting to hand over its sentinel
+            while decoder.is_alive():
+                try:
+                    windows.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            decoder.join()
+
+        if decode_errors:
+            raise decode_errors[0]
+
+        return ' '.join(text for text in texts if text)
+
+    def _voiced_windows(self, windows):
+        """Re-chunk decoded windows into full 30 s windows containing only voiced audio"""
+        if not self._load_vad():
+            yield from windows
+            return
+
+        import numpy as np
+
+        window_samples = _WHISPER_SAMPLE_RATE * _WHISPER_WINDOW_SECONDS
+        pending = []
+        pending_samples = 0
+        for window in windows:
+            voiced = self._vad_trim(window)
+            if not voiced.size:
+                continue
+            pending.append(voiced)
+            pending_samples += voiced.size
+            if pending_samples < window_samples:
+                continue
+
+            audio = np.concatenate(pending)
+            full = audio.size - audio.size % window_samples
+            for start in range(0, full, window_samples):
+                yield audio[start:start + window_samples]
+            pending = [audio[full:]] if full < audio.size else []
+            pending_samples = audio.size - full
+
+        if pending:
+            yield np.concatenate(pending)
+
+    def _load_vad(self) -> bool:
+        """Lazily load Silero VAD; returns False if it is unavailable"""
+        with self._vad_lock:
+            if self._vad is None:
+                try:
+                    try:
+                        from silero_vad import load_silero_vad, get_speech_timestamps
+                        model = load_silero_vad()
+                    except ImportError:
+                        import torch
+                        model, utils = torch.hub.load('snakers4/silero-vad', 'silero_vad', verbose=False)
+                        get_speech_timestamps = utils[0]
+                    self._vad = (model, get_speech_timestamps)
+                    logger.info("Silero VAD loaded - silence is skipped before transcription")
+                except Exception as e:
+                    logger.warning(f"Silero VAD not available - transcribing all audio: {e}")
+                    self._vad = False
+            return bool(self._vad)
+
+    def _vad_trim(self, audio, sr: int = _WHISPER_SAMPLE_RATE):
+        """Return only the voiced segments of a float32 waveform"""
+        import numpy as np
+
+        if not self._load_vad():
+            return audio
+
+        model, get_speech_timestamps = self._vad
+        # The VAD model keeps recurrent state between calls, so serialize use
+        with self._vad_lock:
+            timestamps = get_speech_timestamps(audio, model, sampling_rate=sr)
+        if not timestamps:
+            return audio[:0]
+        return np.concatenate([audio[t['start']:t['end']] for t in timestamps])
+
+    def _decode_audio_windows(self, file_path: Union[str, BinaryIO], trim_silence: bool = False):
+        """
+        Yield 16 kHz mono float32 windows of Whisper's 30 s context decoded by ffmpeg
+
+        A binary stream instead of a path is copied into ffmpeg's stdin by a
+        background thread, so the upload never has to be written to disk.
+        With trim_silence, ffmpeg's silenceremove filter drops pauses in the
+        same pass, so every window is already voiced audio.
+        """
+        import numpy as np
+
+        piped = not isinstance(file_path, str)
+        # ffmpeg emits float32 PCM directly, so samples need no conversion pass
+        cmd = [
+            self._ffmpeg_path or 'ffmpeg', '-v', 'error',
+            *(['-i', 'pipe:0'] if piped else ['-nostdin', '-i', file_path]),
+            *(['-af', _SILENCE_REMOVE_FILTER] if trim_silence else []),
+            '-f', 'f32le', '-acodec', 'pcm_f32le', '-ac', '1', '-ar', str(_WHISPER_SAMPLE_RATE), 'pipe:1'
+        ]
+        window_bytes = _WHISPER_SAMPLE_RATE * _WHISPER_WINDOW_SECONDS * 4  # float32 samples
+
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if piped else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        feeder = None
+        if piped:
+            feeder = threading.Thread(
+                target=self._feed_stdin, args=(file_path, process.stdin), name="ffmpeg-stdin", daemon=True
+            )
+            feeder.start()
+        try:
+            while True:
+                # A fresh writable buffer per window, wrapped without copying
+                buffer = bytearray(window_bytes)
+                read = process.stdout.readinto(buffer)
+                if not read:
+                    break
+                yield np.frombuffer(buffer, dtype=np.float32, count=read // 4)
+
+            if process.wait() != 0:
+                error = process.stderr.read().decode('utf-8', errors='ignore').strip()
+                raise Exception(f"FFmpeg could not decode audio: {error}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if feeder is not None:
+                feeder.join()
+            process.stdout.close()
+            process.stderr.close()
+
+    @staticmethod
+    def _feed_stdin(source: BinaryIO, stdin) -> None:
+        """Copy a binary stream into a subprocess' stdin, then close it to signal EOF"""
+        try:
+            shutil.copyfileobj(source, stdin, _STDIN_COPY_BUFSIZE)
+        except OSError:
+            pass  # ffmpeg exited (or was killed) before consuming all input
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
     def extract_audio_from_video(self, video_path: str, audio_path: str) -> bool:
         """
         Extract audio track from video file
 
+        The track is written as 16 kHz mono WAV - the exact format Whisper
+        resamples to - so it is never re-encoded to a lossy codec in between.
+
         Args:
             video_path: Path to video file
             audio_path: Path where to save extracted audio
@@ -119,33 +687,36 @@ class MultimodalProcessor:
         Returns:
             True if successful, False otherwise
         """
-        if not self.moviepy_available:
-            # Try using ffmpeg directly
-            try:
-                cmd = [
-                    'ffmpeg', '-i', video_path, '-vn', '-acodec', 'libmp3lame',
-                    '-ab', '128k', audio_path, '-y'
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            cmd = [
+                self._ffmpeg_path or 'ffmpeg', '-i', video_path, '-vn',
+                '-ac', '1', '-ar', str(_WHISPER_SAMPLE_RATE), '-f', 'wav', audio_path, '-y'
+            ]
+            logger.info(f"Extracting audio from video: {video_path}")
+            result = subprocess.run(cmd, capture_output=True, text=True)
 
-                if result.returncode == 0:
-                    logger.info(f"Audio extracted using ffmpeg: {audio_path}")
-                    return True
-                else:
-                    logger.error(f"FFmpeg extraction failed: {result.stderr}")
-                    return False
+            if result.returncode == 0:
+                logger.info(f"Audio extracted using ffmpeg: {audio_path}")
+                return True
 
-            except FileNotFoundError:
+            if 'does not contain any stream' in result.stderr or 'matches no streams' in result.stderr:
+                logger.error("Video file has no audio track")
+            else:
+                logger.error(f"FFmpeg extraction failed: {result.stderr}")
+            return False
+
+        except FileNotFoundError:
+            if not self.moviepy_available:
                 logger.error("Neither MoviePy nor FFmpeg available for video processing")
                 return False
-            except Exception as e:
-                logger.error(f"Error extracting audio with ffmpeg: {e}")
-                return False
+        except Exception as e:
+            logger.error(f"Error extracting audio with ffmpeg: {e}")
+            return False
 
+        # No FFmpeg binary at all - fall back to MoviePy
         try:
             import moviepy
 
-            logger.info(f"Extracting audio from video: {video_path}")
             video = moviepy.VideoFileClip(video_path)
             
             # Check if video has audio
@@ -156,10 +727,10 @@ class MultimodalProcessor:
             
             # MoviePy 2.x API - removed verbose and logger parameters
             try:
-                video.audio.write_audiofile(audio_path)
+                video.audio.write_audiofile(audio_path, fps=_WHISPER_SAMPLE_RATE)
             except TypeError:
                 # Fallback for older MoviePy versions
-                video.audio.write_audiofile(audio_path, verbose=False, logger=None)
+                video.audio.write_audiofile(audio_path, fps=_WHISPER_SAMPLE_RATE, verbose=False, logger=None)
             
             video.close()
 
@@ -183,186 +754,274 @@ class MultimodalProcessor:
         logger.info(f"Starting caption extraction for: {os.path.basename(video_path)}")
         
         try:
-            # Method 1: Try using ffmpeg to extract embedded subtitles
-            logger.info("Method 1: Checking for embedded subtitle tracks...")
-            caption_text = self._extract_embedded_subtitles(video_path)
-            if caption_text:
-                logger.info("✓ Successfully extracted embedded subtitles")
-                return caption_text
-            
-            # Method 2: Check for companion subtitle files
-            logger.info("Method 2: Checking for companion subtitle files...")
-            caption_text = self._check_companion_subtitle_files(video_path)
-            if caption_text:
-                logger.info("✓ Successfully extracted companion subtitle file")
-                return caption_text
-            
-            # Method 3: Try to extract text from video metadata
-            logger.info("Method 3: Checking video metadata for descriptions...")
-            caption_text = self._extract_metadata_text(video_path)
-            if caption_text:
-                logger.info("✓ Successfully extracted metadata text")
-                return caption_text
-            
-            logger.info("✗ No captions found using any extraction method")
-            return None
-            
+            # Embedded subtitles and metadata both block on ffmpeg subprocesses, so run
+            # them in the background while the cheap companion file lookup runs here.
+            # A single ffprobe call (submitted first, so it is never starved of a
+            # worker) answers both the subtitle-stream and the metadata questions.
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+            probe_future = executor.submit(self._probe_media, video_path)
+            embedded_future = executor.submit(
+                lambda: self._extract_embedded_subtitles(video_path, probe_future.result()))
+            metadata_future = executor.submit(
+                lambda: self._extract_metadata_text(video_path, probe_future.result()))
+
+            try:
+                # Method 1: Check for companion subtitle files
+                logger.info("Method 1: Checking for companion subtitle files...")
+                caption_text = self._check_companion_subtitle_files(video_path)
+                if caption_text:
+                    logger.info("✓ Successfully extracted companion subtitle file")
+                    return caption_text
+
+                # Method 2: Try using ffmpeg to extract embedded subtitles
+                logger.info("Method 2: Checking for embedded subtitle tracks...")
+                caption_text = embedded_future.result()
+                if caption_text:
+                    logger.info("✓ Successfully extracted embedded subtitles")
+                    return caption_text
+
+                # Method 3: Try to extract text from video metadata
+                logger.info("Method 3: Checking video metadata for descriptions...")
+                caption_text = metadata_future.result()
+                if caption_text:
+                    logger.info("✓ Successfully extracted metadata text")
+                    return caption_text
+
+                logger.info("✗ No captions found using any extraction method")
+                return None
+
+            finally:
+                # Don't block on probes whose result is no longer needed
+                executor.shutdown(wait=False, cancel_futures=True)
+
         except Exception as e:
             logger.warning(f"Could not extract captions: {e}")
             return None
 
-    def _extract_embedded_subtitles(self, video_path: str) -> Optional[str]:
+    def _extract_embedded_subtitles(self, video_path: str, probe: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Extract embedded subtitle tracks from video"""
+        if not self._ffmpeg_path:
+            return None
+
         try:
-            import imageio_ffmpeg
-            ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-            
-            # First, get detailed information about the video
-            probe_cmd = [
-                ffmpeg_path, '-i', video_path, '-hide_banner'
-            ]
-            
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            
-            # Log video information for debugging
-            logger.info("Video file analysis:")
-            video_info_lines = []
-            subtitle_streams = []
-            
-            for line in probe_result.stderr.split('\n'):
-                line = line.strip()
-                if 'Stream #' in line:
-                    video_info_lines.append(f"  {line}")
-                    if 'subtitle' in line.lower():
-                        # Extract stream index
-                        try:
-                            stream_part = line.split('Stream #')[1].split(':')[1].split('(')[0]
-                            subtitle_streams.append(int(stream_part))
-                        except:
-                            # Fallback parsing
-                            if 'subtitle' in line.lower():
-                                subtitle_streams.append(len(subtitle_streams))
-            
-            if video_info_lines:
-                logger.info("Streams found:")
-                for line in video_info_lines:
-                    logger.info(line)
-            
+            if probe is not None:
+                subtitle_streams = probe['subtitle_streams']
+            else:
+                subtitle_streams = self._list_subtitle_streams(video_path)
+
             logger.info(f"Detected {len(subtitle_streams)} subtitle streams: {subtitle_streams}")
-            
+
             if not subtitle_streams:
                 logger.info("No embedded subtitle streams found in video")
                 return None
-            
-            # Try to extract each subtitle stream
+
+            if len(subtitle_streams) > 1:
+                caption_text, batch_ok = self._extract_subtitle_batch(video_path, subtitle_streams)
+                if batch_ok:
+                    return caption_text
+                # One unconvertible track (e.g. bitmap subtitles) fails the whole batch
+                logger.info("Batch subtitle extraction failed, retrying stream by stream...")
+
+            # Single streams go straight through a pipe - no intermediate .srt on disk
             for i in subtitle_streams:
-                try:
-                    subtitle_path = f"{video_path}_subtitles_{i}.srt"
-                    
-                    # Extract subtitles using ffmpeg
-                    cmd = [
-                        ffmpeg_path, '-i', video_path, '-map', f'0:s:{i}',
-                        '-c:s', 'srt', subtitle_path, '-y'
-                    ]
-                    
-                    logger.info(f"Attempting to extract subtitle stream {i}...")
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-                    
-                    if result.returncode == 0 and os.path.exists(subtitle_path):
-                        # Check file size
-                        file_size = os.path.getsize(subtitle_path)
-                        logger.info(f"Extracted subtitle file size: {file_size} bytes")
-                        
-                        if file_size > 0:
-                            # Read and parse SRT file
-                            with open(subtitle_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                srt_content = f.read()
-                            
-                            # Clean up subtitle file
-                            os.unlink(subtitle_path)
-                            
-                            # Parse SRT format - extract just the text
-                            caption_text = self._parse_srt_content(srt_content)
-                            
-                            if caption_text and len(caption_text) > 50:
-                                logger.info(f"✓ Successfully extracted {len(caption_text)} characters from embedded subtitles (stream {i})")
-                                return caption_text
-                            else:
-                                logger.info(f"Subtitle stream {i} extracted but content too short: {len(caption_text) if caption_text else 0} characters")
-                        else:
-                            logger.info(f"Subtitle stream {i} extracted but file is empty")
-                    else:
-                        logger.info(f"Failed to extract subtitle stream {i}: {result.stderr}")
-                
-                except Exception as e:
-                    logger.warning(f"Failed to extract subtitle stream {i}: {e}")
-                    continue
-            
+                srt_content = self._pipe_subtitle_stream(video_path, i)
+                if srt_content:
+                    caption_text = self._parse_extracted_subtitles(srt_content, i)
+                    if caption_text:
+                        return caption_text
+
             return None
-            
+
         except Exception as e:
             logger.warning(f"Could not extract embedded subtitles: {e}")
             return None
 
+    def _extract_subtitle_batch(self, video_path: str, subtitle_streams: List[int]) -> Tuple[Optional[str], bool]:
+        """
+        Demux the container once and write every subtitle track in a single ffmpeg run
+
+        Returns:
+            Tuple of (caption_text, batch_succeeded)
+        """
+        subtitle_paths = {i: f"{video_path}_subtitles_{i}.srt" for i in subtitle_streams}
+        cmd = [self._ffmpeg_path, '-y', '-i', video_path]
+        for i, subtitle_path in subtitle_paths.items():
+            cmd.extend(['-map', f'0:{i}', '-c:s', 'srt', subtitle_path])
+
+        try:
+            logger.info(f"Extracting {len(subtitle_paths)} subtitle streams in one pass...")
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.info(f"Failed to extract subtitle streams {subtitle_streams}: {result.stderr}")
+                return None, False
+
+            for i, subtitle_path in subtitle_paths.items():
+                if not os.path.exists(subtitle_path) or os.path.getsize(subtitle_path) == 0:
+                    logger.info(f"Subtitle stream {i} extracted but file is empty")
+                    continue
+
+                with open(subtitle_path, 'rb') as f:
+                    caption_text = self._parse_extracted_subtitles(_decode_subtitle_bytes(f.read()), i)
+                if caption_text:
+                    return caption_text, True
+
+            return None, True
+
+        finally:
+            # Clean up subtitle files
+            for subtitle_path in subtitle_paths.values():
+                try:
+                    if os.path.exists(subtitle_path):
+                        os.unlink(subtitle_path)
+                except OSError:
+                    pass
+
+    def _pipe_subtitle_stream(self, video_path: str, stream_index: int) -> Optional[str]:
+        """Convert one subtitle stream to SRT, reading it from ffmpeg's stdout"""
+        cmd = [
+            self._ffmpeg_path, '-i', video_path, '-map', f'0:{stream_index}',
+            '-c:s', 'srt', '-f', 'srt', 'pipe:1'
+        ]
+
+        try:
+            logger.info(f"Attempting to extract subtitle stream {stream_index}...")
+            result = subprocess.run(cmd, capture_output=True)
+        except Exception as e:
+            logger.warning(f"Failed to extract subtitle stream {stream_index}: {e}")
+            return None
+
+        if result.returncode != 0:
+            logger.info(f"Failed to extract subtitle stream {stream_index}: {result.stderr.decode('utf-8', errors='ignore')}")
+            return None
+
+        logger.info(f"Extracted subtitle stream size: {len(result.stdout)} bytes")
+        if not result.stdout:
+            logger.info(f"Subtitle stream {stream_index} extracted but is empty")
+            return None
+
+        return _decode_subtitle_bytes(result.stdout)
+
+    def _parse_extracted_subtitles(self, srt_content: str, stream_index: int) -> Optional[str]:
+        """Parse SRT content produced by ffmpeg, returning its text if substantial"""
+        # Parse SRT format - extract just the text
+        caption_text = self._parse_srt_content(srt_content)
+
+        if caption_text and len(caption_text) > 50:
+            logger.info(f"✓ Successfully extracted {len(caption_text)} characters from embedded subtitles (stream {stream_index})")
+            return caption_text
+
+        logger.info(f"Subtitle stream {stream_index} extracted but content too short: {len(caption_text) if caption_text else 0} characters")
+        return None
+
+    def _probe_media(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Probe subtitle streams and container tags with a single ffprobe call
+
+        Returns:
+            Dict with 'subtitle_streams' (absolute stream indices) and 'tags',
+            or None if ffprobe is unavailable or fails
+        """
+        if not self._ffprobe_path:
+            return None
+
+        try:
+            cmd = [
+                self._ffprobe_path, '-v', 'error', '-select_streams', 's',
+                '-show_entries', 'stream=index,codec_name:stream_tags=language:format_tags',
+                '-of', 'json', video_path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.info(f"ffprobe failed, falling back to ffmpeg: {result.stderr.strip()}")
+                return None
+
+            data = json.loads(result.stdout or '{}')
+        except Exception as e:
+            logger.warning(f"Could not probe video with ffprobe: {e}")
+            return None
+
+        streams = data.get('streams', [])
+        for stream in streams:
+            language = stream.get('tags', {}).get('language', 'und')
+            logger.info(f"  Subtitle stream #{stream['index']}: {stream.get('codec_name', 'unknown')} ({language})")
+
+        return {
+            'subtitle_streams': [stream['index'] for stream in streams],
+            'tags': data.get('format', {}).get('tags', {}),
+        }
+
+    def _list_subtitle_streams(self, video_path: str) -> List[int]:
+        """Return subtitle stream indices from ffmpeg's stream listing (no ffprobe)"""
+        # imageio-ffmpeg only bundles ffmpeg, so parse its stream listing instead
+        result = subprocess.run([self._ffmpeg_path, '-i', video_path, '-hide_banner'], capture_output=True, text=True)
+        return [int(index) for index in _FFMPEG_SUBTITLE_STREAM_RE.findall(result.stderr)]
+
     def _check_companion_subtitle_files(self, video_path: str) -> Optional[str]:
         """Check for subtitle files with the same name as the video"""
         try:
             base_path = os.path.splitext(video_path)[0]
-            subtitle_extensions = ['.srt', '.vtt', '.ass', '.ssa', '.sub', '.sbv']
-            language_codes = ['', '.en', '.eng', '.english', '.es', '.fr', '.de', '.it', '.pt', '.ru', '.ja', '.ko', '.zh']
-            
-            logger.info(f"Checking for companion subtitle files for: {os.path.basename(video_path)}")
-            
-            # Check for exact matches first
-            for ext in subtitle_extensions:
-                subtitle_file = base_path + ext
-                if os.path.exists(subtitle_file):
-                    logger.info(f"Found exact match subtitle file: {subtitle_file}")
-                    caption_text = self._process_subtitle_file(subtitle_file, ext)
-                    if caption_text:
-                        return caption_text
-            
-            # Check for language-specific subtitle files (e.g., video.en.vtt)
-            for lang in language_codes:
-                if not lang:  # Skip empty string as we already checked exact matches
-                    continue
-                for ext in subtitle_extensions:
-                    subtitle_file = base_path + lang + ext
-                    if os.path.exists(subtitle_file):
-                        logger.info(f"Found language-specific subtitle file: {subtitle_file}")
-                        caption_text = self._process_subtitle_file(subtitle_file, ext)
-                        if caption_text:
-                            return caption_text
-            
-            # Check for files in the same directory with similar names (for downloaded videos)
-            directory = os.path.dirname(video_path)
+            directory = os.path.dirname(video_path) or '.'
             video_basename = os.path.basename(base_path)
-            
+
+            logger.info(f"Checking for companion subtitle files for: {os.path.basename(video_path)}")
+
+            # Isolated uploads land in the shared temp dir, which never holds
+            # their subtitles but may hold thousands of unrelated files
+            if os.path.realpath(directory) == os.path.realpath(tempfile.gettempdir()):
+                logger.info("Video is in the temp directory, skipping companion subtitle scan")
+                return None
+
+            # One (cached) directory scan replaces a stat() per extension/language combination
             try:
-                for filename in os.listdir(directory):
-                    if filename.startswith(video_basename):
-                        for ext in subtitle_extensions:
-                            if filename.endswith(ext):
-                                subtitle_file = os.path.join(directory, filename)
-                                logger.info(f"Found similar-named subtitle file: {subtitle_file}")
-                                caption_text = self._process_subtitle_file(subtitle_file, ext)
-                                if caption_text:
-                                    return caption_text
-            except Exception as e:
+                filenames = _list_directory_files(directory, os.stat(directory).st_mtime_ns)
+            except OSError as e:
                 logger.warning(f"Could not scan directory for subtitle files: {e}")
-            
+                return None
+
+            if filenames is None:
+                logger.info(f"Directory has over {_MAX_COMPANION_SCAN_ENTRIES} entries, skipping companion subtitle scan")
+                return None
+
+            candidates = [
+                name for name in filenames
+                if name.startswith(video_basename) and _file_extension(name) in _SUBTITLE_EXTENSIONS
+            ]
+
+            # Prefer exact matches, then language-specific files (e.g. video.en.vtt),
+            # then any similarly named file (e.g. from video downloaders)
+            candidates.sort(key=lambda name: self._companion_subtitle_rank(name, video_basename))
+
+            for filename in candidates:
+                subtitle_file = os.path.join(directory, filename)
+                logger.info(f"Found companion subtitle file: {subtitle_file}")
+                caption_text = self._process_subtitle_file(subtitle_file, os.path.splitext(filename)[1].lower())
+                if caption_text:
+                    return caption_text
+
             logger.info("No companion subtitle files found")
             return None
-            
+
         except Exception as e:
             logger.warning(f"Could not check companion subtitle files: {e}")
             return None
 
+    def _companion_subtitle_rank(self, filename: str, video_basename: str) -> Tuple[int, int, int, str]:
+        """Sort key ordering companion subtitle files from most to least specific"""
+        stem, ext = os.path.splitext(filename)
+        ext_rank = _SUBTITLE_EXTENSION_ORDER.index(ext.lower())
+        suffix = stem[len(video_basename):].lower()
+
+        if not suffix:
+            return (0, 0, ext_rank, filename)
+        if suffix in _SUBTITLE_LANGUAGE_CODES:
+            return (1, _SUBTITLE_LANGUAGE_CODES.index(suffix), ext_rank, filename)
+        return (2, 0, ext_rank, filename)
+
     def _process_subtitle_file(self, subtitle_file: str, ext: str) -> Optional[str]:
         """Process a subtitle file and extract text content"""
         try:
-            with open(subtitle_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            with open(subtitle_file, 'rb') as f:
+                content = _decode_subtitle_bytes(f.read())
             
             if ext == '.srt':
                 caption_text = self._parse_srt_content(content)
@@ -383,94 +1042,69 @@ class MultimodalProcessor:
             logger.warning(f"Could not process subtitle file {subtitle_file}: {e}")
             return None
 
-    def _extract_metadata_text(self, video_path: str) -> Optional[str]:
+    def _extract_metadata_text(self, video_path: str, probe: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Try to extract text from video metadata or description"""
         try:
-            import imageio_ffmpeg
-            ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-            
-            # Extract metadata
-            cmd = [
-                ffmpeg_path, '-i', video_path, '-f', 'ffmetadata', '-'
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                metadata_text = result.stdout
-                
-                # Look for description or comment fields that might contain transcript
-                description_text = ""
-                for line in metadata_text.split('\n'):
-                    if line.startswith('description=') or line.startswith('comment='):
-                        desc = line.split('=', 1)[1]
-                        if len(desc) > 100:  # Only consider substantial descriptions
-                            description_text += desc + " "
-                
-                if description_text and len(description_text) > 100:
-                    logger.info(f"Extracted {len(description_text)} characters from video metadata")
-                    return description_text.strip()
-            
+            if probe is not None:
+                # Container tags already came back with the ffprobe call
+                fields = probe['tags'].items()
+            elif self._ffmpeg_path:
+                # Extract metadata
+                cmd = [
+                    self._ffmpeg_path, '-i', video_path, '-f', 'ffmetadata', '-'
+                ]
+
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    return None
+
+                fields = (line.split('=', 1) for line in result.stdout.split('\n') if '=' in line)
+            else:
+                return None
+
+            # Look for description or comment fields that might contain transcript
+            description_text = ""
+            for key, value in fields:
+                if key.lower() in ('description', 'comment'):
+                    if len(value) > 100:  # Only consider substantial descriptions
+                        description_text += value + " "
+
+            if description_text and len(description_text) > 100:
+                logger.info(f"Extracted {len(description_text)} characters from video metadata")
+                return description_text.strip()
+
             return None
-            
+
         except Exception as e:
             logger.warning(f"Could not extract metadata text: {e}")
             return None
 
     def _parse_srt_content(self, srt_content: str) -> str:
         """Parse SRT subtitle format and extract text"""
-        lines = srt_content.split('\n')
-        text_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            # Skip empty lines, numbers, and timestamps
-            if line and not line.isdigit() and '-->' not in line:
-                # Remove HTML tags if present
-                import re
-                line = re.sub(r'<[^>]+>', '', line)
-                text_lines.append(line)
-        
-        return ' '.join(text_lines)
+        return self._parse_cue_text(srt_content)
 
     def _parse_vtt_content(self, vtt_content: str) -> str:
         """Parse WebVTT subtitle format and extract text"""
-        lines = vtt_content.split('\n')
-        text_lines = []
-        
-        skip_next = False
-        for line in lines:
-            line = line.strip()
-            
-            # Skip WebVTT header
-            if line.startswith('WEBVTT'):
-                continue
-            
-            # Skip timestamps
-            if '-->' in line:
-                skip_next = False
-                continue
-            
-            # Skip cue identifiers
-            if line and not skip_next and not line.isdigit():
-                # Remove HTML tags if present
-                import re
-                line = re.sub(r'<[^>]+>', '', line)
-                if line:
-                    text_lines.append(line)
-        
-        return ' '.join(text_lines)
+        # WEBVTT header, NOTE and STYLE blocks never follow a timing line,
+        # so the cue regex skips them without any special casing
+        return self._parse_cue_text(vtt_content)
+
+    def _parse_cue_text(self, content: str) -> str:
+        """Extract cue text from timed subtitle content in a single regex pass"""
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        cues = _CUE_TEXT_RE.findall(content)
+        text = _HTML_TAG_RE.sub('', ' '.join(cues))
+        # Blank out stray control characters, then collapse all whitespace runs
+        return ' '.join(text.translate(_CONTROL_CHARS_TO_SPACE).split())
 
     def _extract_text_from_subtitle_content(self, content: str) -> str:
         """Basic text extraction from subtitle content"""
-        import re
-        
         # Remove timestamps (various formats)
         content = re.sub(r'\d{2}:\d{2}:\d{2}[.,]\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}[.,]\d{3}', '', content)
         content = re.sub(r'\d{2}:\d{2}:\d{2}\s*-->\s*\d{2}:\d{2}:\d{2}', '', content)
         
         # Remove HTML/XML tags
-        content = re.sub(r'<[^>]+>', '', content)
+        content = _HTML_TAG_RE.sub('', content)
         
         # Remove subtitle numbers
         content = re.sub(r'^\d+$', '', content, flags=re.MULTILINE)
@@ -492,7 +1126,8 @@ class MultimodalProcessor:
         Returns:
             Tuple of (extracted_text, metadata)
         """
-        if not self.is_supported_file(filename):
+        kind = self._classify(filename) if filename else None
+        if kind is None:
             raise Exception(f"Unsupported file format. Supported formats: {self.supported_audio_formats | self.supported_video_formats}")
 
         try:
@@ -500,7 +1135,7 @@ class MultimodalProcessor:
             extraction_method = "unknown"
             
             # If it's a video file, try captions first
-            if self.is_video_file(filename):
+            if kind == 'video':
                 logger.info("Attempting to extract captions from video...")
                 caption_text = self.extract_captions_from_video(file_path)
                 
@@ -545,7 +1180,12 @@ class MultimodalProcessor:
             # Clean up any temporary files
             pass
 
-    def process_file(self, file_obj, filename: str, model_size: str = "base") -> Tuple[str, Dict[str, Any]]:
+    async def aprocess_file_from_path(self, file_path: str, filename: str, model_size: str = "base") -> Tuple[str, Dict[str, Any]]:
+        """Async variant of process_file_from_path that runs on a worker thread"""
+        return await asyncio.to_thread(self.process_file_from_path, file_path, filename, model_size)
+
+    def process_file(self, file_obj, filename: str, model_size: str = "base",
+                     batch_size: int = 8) -> Tuple[str, Dict[str, Any]]:
         """
         Process uploaded audio/video file and extract text
 
@@ -553,60 +1193,107 @@ class MultimodalProcessor:
             file_obj: File object from Flask request
             filename: Original filename
             model_size: Whisper model size
+            batch_size: Whisper windows transcribed per batch (faster-whisper only)
 
         Returns:
             Tuple of (extracted_text, metadata)
         """
-        if not self.is_supported_file(filename):
+        kind = self._classify(filename) if filename else None
+        if kind is None:
             raise Exception(f"Unsupported file format. Supported formats: {self.supported_audio_formats | self.supported_video_formats}")
 
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
-            temp_path = temp_file.name
-            file_obj.save(temp_path)
+        ext = _file_extension(filename)
+        if ext not in _SEEKABLE_INPUT_EXTENSIONS:
+            # Stream the upload straight into ffmpeg - nothing touches the disk
+            stream = getattr(file_obj, 'stream', file_obj)
+            text = self.extract_text_from_audio_video(stream, model_size, batch_size)
+            return text, self._generate_metadata(filename, text, None, file_size=self._stream_size(stream))
 
-        try:
-            # If it's a video file, extract audio first
-            if self.is_video_file(filename):
-                audio_temp_path = temp_path + "_audio.mp3"
-                if not self.extract_audio_from_video(temp_path, audio_temp_path):
-                    raise Exception("Failed to extract audio from video file")
-
-                # Use the extracted audio for transcription
-                transcription_path = audio_temp_path
-            else:
-                # Audio file - use directly
-                transcription_path = temp_path
-
-            # Extract text using Whisper
-            text = self.extract_text_from_audio_video(transcription_path, model_size)
+        with self._seekable_upload(file_obj, ext) as temp_path:
+            # ffmpeg decodes the audio track of audio and video files alike
+            # straight to float32 PCM, so no intermediate audio file is written
+            text = self.extract_text_from_audio_video(temp_path, model_size, batch_size)
 
             # Generate metadata
-            metadata = self._generate_metadata(filename, text, transcription_path)
+            metadata = self._generate_metadata(filename, text, temp_path)
 
             return text, metadata
 
+    @contextmanager
+    def _seekable_upload(self, file_obj, suffix: str):
+        """
+        Yield a path ffmpeg can seek in that holds the uploaded file
+
+        Uploads up to _MAX_IN_MEMORY_UPLOAD go into an anonymous in-memory file
+        (memfd, Linux) reached through /proc; anything larger, or platforms
+        without memfd, use a temporary file on disk.
+        """
+        stream = getattr(file_obj, 'stream', file_obj)
+        fd = None
+        if hasattr(os, 'memfd_create') and 0 < self._stream_size(stream) <= _MAX_IN_MEMORY_UPLOAD:
+            try:
+                fd = os.memfd_create(f"upload{suffix}")
+                with os.fdopen(fd, 'wb', closefd=False) as memory_file:
+                    shutil.copyfileobj(stream, memory_file, _STDIN_COPY_BUFSIZE)
+            except OSError as e:
+                logger.warning(f"In-memory upload file unavailable, using disk: {e}")
+                if fd is not None:
+                    os.close(fd)
+                    fd = None
+                if hasattr(stream, 'seek'):
+                    stream.seek(0)
+
+        if fd is not None:
+            try:
+                # Other processes open the memfd through this process' fd table
+                yield f"/proc/{os.getpid()}/fd/{fd}"
+            finally:
+                os.close(fd)
+            return
+
+        # Create temporary file
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            temp_path = temp_file.name
+            file_obj.save(temp_path)
+
+        try:
+            yield temp_path
         finally:
-            # Clean up temporary files
+            # Clean up temporary file
             try:
                 os.unlink(temp_path)
-                if self.is_video_file(filename):
-                    audio_temp_path = temp_path + "_audio.mp3"
-                    if os.path.exists(audio_temp_path):
-                        os.unlink(audio_temp_path)
             except OSError:
                 pass  # Ignore cleanup errors
 
-    def _generate_metadata(self, filename: str, text: str, file_path: str) -> Dict[str, Any]:
-        """Generate metadata for the processed file"""
+    @staticmethod
+    def _stream_size(stream: BinaryIO) -> int:
+        """Return the total size of a seekable stream, or 0 if it cannot be determined"""
+        try:
+            return os.fstat(stream.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            pass
+        try:
+            position = stream.tell()
+            size = stream.seek(0, os.SEEK_END)
+            stream.seek(position)
+            return size
+        except (AttributeError, OSError, ValueError):
+            return 0
+
+    def _generate_metadata(self, filename: str, text: str, file_path: Optional[str],
+                           file_size: Optional[int] = None) -> Dict[str, Any]:
+        """Generate metadata for the processed file (file_path is None for streamed uploads)"""
         import time
 
+        if file_size is None:
+            file_size = os.path.getsize(file_path) if file_path and os.path.exists(file_path) else 0
+
         metadata = {
             'title': os.path.splitext(filename)[0],
             'filename': filename,
-            'file_type': 'video' if self.is_video_file(filename) else 'audio',
-            'duration': self._get_file_duration(file_path),
-            'size': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            'file_type': 'video' if self._classify(filename) == 'video' else 'audio',
+            'duration': self._get_file_duration(file_path) if file_path else None,
+            'size': file_size,
             'text_length': len(text),
             'processing_time': time.time(),
             'language': 'English (auto-detected)',
@@ -618,6 +1305,19 @@ class MultimodalProcessor:
     def _get_file_duration(self, file_path: str) -> Optional[float]:
         """Get duration of audio/video file in seconds"""
         try:
+            # ffprobe reads the duration from container metadata without decoding
+            try:
+                ffprobe = self._ffprobe_path or 'ffprobe'
+                if file_path.startswith('/proc/'):
+                    # In-memory uploads are reached through /proc/<pid>/fd/<n>; fd
+                    # numbers are reused, so the path and mtime do not identify the file
+                    return _ffprobe_duration(ffprobe, file_path)
+                return _probe_duration(ffprobe, file_path, os.stat(file_path).st_mtime_ns)
+            except FileNotFoundError:
+                if not os.path.exists(file_path):
+                    raise
+
+            # No ffprobe installed - MoviePy opens (and decodes) the whole file
             if self.moviepy_available:
                 import moviepy
                 if self.is_video_file(file_path):
@@ -631,22 +1331,6 @@ class MultimodalProcessor:
                     duration = audio.duration
                     audio.close()
                     return duration
-            else:
-                # Try using ffprobe
-                try:
-                    cmd = [
-                        'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                        '-show_format', '-show_streams', file_path
-                    ]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-
-                    if result.returncode == 0:
-                        import json
-                        data = json.loads(result.stdout)
-                        duration = float(data['format']['duration'])
-                        return duration
-                except:
-                    pass
 
         except Exception as e:
             logger.warning(f"Could not determine file duration: {e}")
@@ -662,7 +1346,8 @@ class MultimodalProcessor:
         """
         try:
             # Check file extension
-            if not self.is_supported_file(filename):
+            kind = self._classify(filename) if filename else None
+            if kind is None:
                 return False, f"Unsupported file format. Supported: {', '.join(self.supported_audio_formats | self.supported_video_formats)}"
 
             # Check file size (max 500MB for audio/video)
@@ -692,41 +1377,19 @@ class MultimodalProcessor:
     def _validate_file_header(self, header: bytes, filename: str) -> bool:
         """Basic file header validation"""
         try:
-            if self.is_audio_file(filename):
-                # MP3: ID3 or ÿû
-                if header.startswith(b'ID3') or header.startswith(b'\xff\xfb'):
-                    return True
-                # WAV: RIFF
-                if header.startswith(b'RIFF'):
-                    return True
-                # FLAC: fLaC
-                if header.startswith(b'fLaC'):
-                    return True
-                # OGG: OggS
-                if header.startswith(b'OggS'):
-                    return True
-
-            elif self.is_video_file(filename):
-                # MP4: ftyp
-                if b'ftyp' in header:
-                    return True
-                # AVI: RIFF
-                if header.startswith(b'RIFF'):
-                    return True
-                # MOV: wide or mdat
-                if header.startswith(b'wide') or b'mdat' in header:
-                    return True
-                # WebM: EBML header (1A 45 DF A3)
-                if header.startswith(b'\x1a\x45\xdf\xa3'):
-                    return True
-                # MKV: EBML header (same as WebM)
-                if header.startswith(b'\x1a\x45\xdf\xa3'):
-                    return True
-                # FLV: FLV header
-                if header.startswith(b'FLV'):
-                    return True
+            kind = self._classify(filename)
+            if kind is None:
+                return False
 
-            return False
+            # Longest magic first so e.g. 'fLaC' wins over a shorter prefix
+            for length in _HEADER_MAGIC_LENGTHS:
+                magic_kind = _HEADER_MAGIC.get(header[:length])
+                if magic_kind is not None:
+                    return magic_kind in (kind, 'any')
+
+            # ISO media (MP4/M4A) keeps its 'ftyp' box at offset 4; older MOV files
+            # may open with a 'wide' or 'mdat' atom instead
+            return b'ftyp' in header or (kind == 'video' and (b'wide' in header or b'mdat' in header))
 
         except:
-            return False
\ No newline at end of file
+            return False
@@ -1,15 +1,32 @@
-import PyPDF2
 import os
 from .preprocessing import clean_text
+from .extract_cache import ExtractCache, hash_source
+from .regex_prefilter import RegexPrefilter, PrefilterGate
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 import logging
 import io
+import mmap
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from importlib import metadata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+__all__ = ['PDFProcessor', 'pdf_processor']
 
 # Set up logging first
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# pypdf is PyPDF2's maintained successor with the same API and faster parsing
+try:
+    import pypdf as PyPDF2
+except ImportError:
+    import PyPDF2
+
 # Try to import PyMuPDF, but don't fail if not available
 try:
     import fitz  # PyMuPDF for better PDF processing
@@ -18,148 +35,710 @@ except ImportError:
     HAS_PYMUPDF = False
     logger.warning("PyMuPDF not available - using PyPDF2 fallback")
 
+# PDFium (C++) text extraction is several times faster than pure-Python PyPDF2
+try:
+    import pypdfium2 as pdfium
+    HAS_PYPDFIUM2 = True
+except ImportError:
+    HAS_PYPDFIUM2 = False
+
+# Optional: Numba-compiled single-pass line break fixer (needs NumPy as well)
+try:
+    import numba
+    import numpy as np
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Post-processing patterns, compiled once instead of per document
+# _fix_text_extraction_artifacts
+_RE_HYPHEN = re.compile(r'(\w)-\s*\n\s*(\w)')
+_RE_LINEBREAK = re.compile(r'(\w)\s*\n\s*(?![A-Z])')
+_RE_SENTENCE_BREAK = re.compile(r'([.!?])\s*\n\s*([A-Z])')
+_RE_MISSING_SPACE = re.compile(r'(\w)\.([A-Z])')
+# _fused_postprocess: whitespace normalization
+_RE_SPACES = re.compile(r' +')
+_RE_SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,!?;:])')
+_RE_SPACE_AFTER_PUNCT = re.compile(r'([.,!?;:])\s+')
+# _fused_postprocess: academic content
+# Both bounded to a single line so a caption or header can never swallow the rest of the document
+_RE_HEADER = re.compile(r'^.{0,5000}?(?=Abstract|Introduction|Chapter|Section|Conclusion)', re.MULTILINE | re.IGNORECASE)
+_RE_CITATION = re.compile(r'\s*\[\d+\]')
+_RE_YEAR = re.compile(r'\s*\(\d{4}\)')
+_RE_CAPTION = re.compile(r'(?:Figure|Fig\.|Table|TABLE)[ \t]*\d+[:.]?[^\n]{0,200}', re.IGNORECASE)
+_RE_NUMBERING = re.compile(r'^\s*[\d]+\.?\s*', re.MULTILINE)
+_RE_BULLET = re.compile(r'^\s*[•●■]\s*', re.MULTILINE)
+# A page number, matched against a single already-stripped line
+_RE_PAGENUM_LINE = re.compile(r'-?\s*\d+')
+# _enhanced_text_cleaning
+_RE_ISOLATED_NUMBER = re.compile(r'(?<!\w)\d+(?!\w)')
+_RE_TRAILING_L = re.compile(r'\b(\w+)l\b')
+_RE_TRAILING_ZERO = re.compile(r'\b(\w+)0\b')
+
+# Characters at least one of which must occur for the pattern to match; a
+# substring check is a C-level scan, far cheaper than a regex pass
+_REQUIRED_CHARS = {
+    _RE_HYPHEN: '-',
+    _RE_SENTENCE_BREAK: '\n',
+    _RE_MISSING_SPACE: '.',
+    _RE_CITATION: '[',
+    _RE_YEAR: '(',
+    _RE_BULLET: '•●■',
+}
+
+_POST_PROCESS_PATTERNS = (
+    _RE_HYPHEN, _RE_LINEBREAK, _RE_SENTENCE_BREAK, _RE_MISSING_SPACE,
+    _RE_SPACES, _RE_SPACE_BEFORE_PUNCT, _RE_SPACE_AFTER_PUNCT,
+    _RE_HEADER, _RE_CITATION, _RE_YEAR, _RE_CAPTION, _RE_NUMBERING, _RE_BULLET,
+    _RE_ISOLATED_NUMBER, _RE_TRAILING_L, _RE_TRAILING_ZERO,
+)
+
+
+# Skips post-processing passes that cannot match (optionally via Hyperscan)
+_PREFILTER = RegexPrefilter(_POST_PROCESS_PATTERNS, _REQUIRED_CHARS, name='post-processing')
+
+def _is_word_byte(c) -> bool:
+    """ASCII equivalent of the regex class \\w"""
+    return (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95
+
+
+def _is_space_byte(c) -> bool:
+    """ASCII equivalent of the regex class \\s for str patterns (includes \\x1c-\\x1f)"""
+    return (9 <= c <= 13) or (28 <= c <= 32)
+
+
+def _fix_linebreaks_kernel(src, out) -> int:
+    """
+    Apply _RE_HYPHEN and then _RE_LINEBREAK to ASCII bytes in a single pass
+
+    Writes into out (at least len(src) long) and returns the output length.
+    Mirrors the regexes exactly, including their backtracking and the way a
+    hyphen join consumes the word character after the break.
+    """
+    n = len(src)
+    o = 0
+    i = 0
+    joined = -1  # index of the word character that ended the last hyphen join
+    while i < n:
+        c = src[i]
+
+        # (\w)-\s*\n\s*(\w) -> \1\2
+        if c == 45 and i > 0 and joined != i - 1 and _is_word_byte(src[i - 1]):
+            j = i + 1
+            newline = False
+            while j < n and _is_space_byte(src[j]):
+                if src[j] == 10:
+                    newline = True
+                j += 1
+            if newline and j < n and _is_word_byte(src[j]):
+                out[o] = src[j]
+                o += 1
+                joined = j
+                i = j + 1
+                continue
+
+        # (\w)\s*\n\s*(?![A-Z]) -> '\1 '
+        elif _is_space_byte(c) and i > 0 and _is_word_byte(src[i - 1]):
+            j = i
+            last_newline = -1
+            prev_newline = -1
+            while j < n and _is_space_byte(src[j]):
+                if src[j] == 10:
+                    prev_newline = last_newline
+                    last_newline = j
+                j += 1
+
+            end = -1
+            if last_newline >= 0:
+                if j == n or not (65 <= src[j] <= 90):
+                    end = j
+                elif j - 1 > last_newline or prev_newline >= 0:
+                    # Backtracking leaves the last whitespace character unmatched
+                    end = j - 1
+
+            if end >= 0:
+                out[o] = 32
+                o += 1
+                start = end
+            else:
+                start = i
+            for k in range(start, j):
+                out[o] = src[k]
+                o += 1
+            i = j
+            continue
+
+        out[o] = c
+        o += 1
+        i += 1
+    return o
+
+
+if HAS_NUMBA:
+    try:
+        _is_word_byte = numba.njit(cache=True)(_is_word_byte)
+        _is_space_byte = numba.njit(cache=True)(_is_space_byte)
+        _fix_linebreaks_kernel = numba.njit(cache=True)(_fix_linebreaks_kernel)
+    except Exception as e:
+        logger.warning(f"Numba line break fixer unavailable: {e}")
+        HAS_NUMBA = False
+
+
+def _fix_linebreaks(text: str) -> Optional[str]:
+    """Compiled fast path for the hyphen and line break passes; None if it does not apply"""
+    if not HAS_NUMBA or not text.isascii():
+        return None
+    src = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    out = np.empty(len(src), dtype=np.uint8)
+    length = _fix_linebreaks_kernel(src, out)
+    return out[:length].tobytes().decode('ascii')
+
+
+# Documents up to this many pages are extracted serially; process start-up
+# costs more than it saves on short PDFs
+_PARALLEL_PAGE_THRESHOLD = 4
+_PAGES_PER_TASK = 4
+
+# Block size for copying PDFs out of unbuffered/network upload streams
+_READ_BLOCK_SIZE = 1024 * 1024
+
+# Scanned pages OCR'd at once; each runs in its own tesseract process
+_MAX_OCR_WORKERS = 4
+# Tesseract's accuracy plateaus around 300 DPI; wide pages are rendered
+# smaller so no page exceeds this many pixels across
+_OCR_DPI = 300
+_OCR_MAX_WIDTH = 3500
+
+# Parsed PyMuPDF documents and pypdf readers kept for reuse across validate/metadata/extract
+_DOC_CACHE_SIZE = 4
+# Validation results and metadata dicts remembered per content hash
+_RESULT_CACHE_SIZE = 128
+
+# Bump whenever extraction or post-processing changes the text produced, so
+# the extraction cache stops serving output of the old pipeline
+_EXTRACT_CACHE_VERSION = 1
+
+# Per-process PyPDF2 reader, parsed once by the pool initializer
+_worker_reader = None
+
+
+def _init_page_worker(source: Union[str, bytes]):
+    """Parse the PDF (a path or its bytes) once in each worker process"""
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+
+
+def _extract_page(page_num: int) -> str:
+    """Extract one page of the worker's PDF"""
+    return _extract_page_text(_worker_reader.pages[page_num], page_num)
+
+
+# Per-process PyMuPDF document, opened once by the pool initializer
+_worker_doc = None
+
+
+def _init_fitz_worker(source: Union[str, bytes]):
+    """Open the PDF (a path or its bytes) with PyMuPDF once in each worker process"""
+    global _worker_doc
+    if isinstance(source, str):
+        _worker_doc = fitz.open(source, filetype="pdf")
+    else:
+        _worker_doc = fitz.open(stream=source, filetype="pdf")
+
+
+def _extract_fitz_page(page_num: int) -> str:
+    """Extract one page of the worker's PyMuPDF document"""
+    return _fitz_page_text(_worker_doc, page_num)
+
+
+def _fitz_page_text(doc, page_num: int) -> str:
+    """Extract text from one page of a PyMuPDF document"""
+    try:
+        page = doc.load_page(page_num)
+        # Use better extraction method for PyMuPDF
+        return page.get_text("text", flags=fitz.TEXT_PRESERVE_WHITESPACE)
+    except Exception as e:
+        logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
+        return ""
+
+
+def _join_pages(page_texts) -> str:
+    """
+    Join the non-blank page texts with blank lines
+
+    Pages are written to one growing buffer as they are produced, so a
+    generator's page strings can be freed instead of all being kept in a
+    list until the final join.
+    """
+    buffer = io.StringIO()
+    separator = ''
+    for text in page_texts:
+        if text and text.strip():
+            buffer.write(separator)
+            buffer.write(text)
+            separator = '\n\n'
+    return buffer.getvalue()
+
+
+def _pdfium_page_text(pdf, page_num: int) -> str:
+    """Extract text from one page of a pypdfium2 document"""
+    page = None
+    textpage = None
+    try:
+        page = pdf[page_num]
+        textpage = page.get_textpage()
+        # PDFium separates lines with CRLF
+        return textpage.get_text_range().replace('\r\n', '\n')
+    except Exception as e:
+        logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
+        return ""
+    finally:
+        if textpage is not None:
+            textpage.close()
+        if page is not None:
+            page.close()
+
+
+def _read_pdf_bytes(pdf_file) -> bytes:
+    """Whole PDF content from a path, bytes, a memory map or a file-like object"""
+    if isinstance(pdf_file, str):
+        with open(pdf_file, 'rb') as f:
+            return f.read()
+    if isinstance(pdf_file, bytes):
+        return pdf_file
+    if isinstance(pdf_file, (bytearray, memoryview, mmap.mmap)):
+        return pdf_file[:]
+
+    stream = getattr(pdf_file, 'stream', pdf_file)  # Werkzeug FileStorage
+    if hasattr(stream, 'seek'):
+        stream.seek(0)
+    if isinstance(stream, io.BytesIO) or hasattr(stream, 'fileno'):
+        # In-memory or file-backed: read() already fetches everything at once
+        return stream.read()
+    # Other streams may read() in small chunks; copy in large blocks instead
+    buffer = io.BytesIO()
+    shutil.copyfileobj(stream, buffer, _READ_BLOCK_SIZE)
+    return buffer.getvalue()
+
+
+def _backing_path(pdf_file) -> Optional[str]:
+    """Path of a PDF given by path, or of an open file object if its name still refers to the file it has open"""
+    if isinstance(pdf_file, str):
+        return pdf_file
+    name = getattr(pdf_file, 'name', None)
+    if not isinstance(name, str):
+        return None
+    try:
+        opened = os.fstat(pdf_file.fileno())
+        on_disk = os.stat(name)
+    except (AttributeError, OSError, ValueError):
+        return None
+    if (opened.st_dev, opened.st_ino) != (on_disk.st_dev, on_disk.st_ino):
+        return None
+    return name
+
+
+def _open_fitz_document(pdf_file):
+    """
+    Open a PDF with PyMuPDF, letting MuPDF read file-backed PDFs itself
+
+    Only in-memory sources are copied into a bytes object first. MuPDF
+    keeps a file it opened by name open, which would block deleting the
+    upload on Windows, so there the content is always read up front.
+    """
+    path = _backing_path(pdf_file)
+    if path and os.name != 'nt':
+        return fitz.open(path, filetype="pdf")
+    return fitz.open(stream=_read_pdf_bytes(pdf_file), filetype="pdf")
+
+
+def _open_pdf_reader(pdf_file):
+    """
+    Parse a PDF with pypdf/PyPDF2 over its own in-memory copy
+
+    Readers load objects lazily from their stream, so one kept in the cache
+    must not depend on a caller's file handle or memory map staying open.
+    """
+    path = _backing_path(pdf_file)
+    if path:
+        return PyPDF2.PdfReader(path)  # Read into memory in one go by the reader
+    return PyPDF2.PdfReader(io.BytesIO(_read_pdf_bytes(pdf_file)))
+
+
+def _extract_page_text(page, page_num: int) -> str:
+    """Extract text from a PyPDF2 page, trying section extraction if it comes back short"""
+    try:
+        # Enhanced text extraction
+        text = page.extract_text()
+
+        # Try alternative extraction if main method fails
+        if not text or len(text.strip()) < 50:
+            # Try extracting in sections
+            text = PDFProcessor._extract_page_sections(page)
+
+        return text or ""
+    except Exception as e:
+        logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
+        return ""
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def _extract_cache_namespace() -> str:
+    """
+    Extraction cache namespace for this process
+
+    Combines the pipeline version with the installed extraction backends and
+    their versions, since those decide which extractor produces the text.
+    """
+    backends = [f"{PyPDF2.__name__}={_package_version(PyPDF2.__name__)}"]
+    if HAS_PYMUPDF:
+        backends.append(f"PyMuPDF={_package_version('PyMuPDF')}")
+    if HAS_PYPDFIUM2:
+        backends.append(f"pypdfium2={_package_version('pypdfium2')}")
+    backends.append(f"pytesseract={_package_version('pytesseract')}")
+    signature = hashlib.blake2b('|'.join(backends).encode('utf-8'), digest_size=4).hexdigest()
+    return f"pdf-v{_EXTRACT_CACHE_VERSION}-{signature}"
+
 
 class PDFProcessor:
     def __init__(self):
         self.use_pymupdf = False  # Disable PyMuPDF until installed
         self.fallback_to_pypdf2 = True
+        self._cache = ExtractCache()
+        # Content hash -> open fitz.Document / PdfReader, so validate, metadata
+        # and extract parse an upload once between them
+        self._doc_cache = OrderedDict()
+        self._reader_cache = OrderedDict()
+        # Content hash -> validate_pdf result / get_pdf_metadata dict
+        self._validation_cache = OrderedDict()
+        self._metadata_cache = OrderedDict()
+        # Neither MuPDF documents nor pypdf readers are thread-safe; this also
+        # guards both caches
+        self._doc_lock = threading.RLock()
         self._check_dependencies()
+        self._cache_namespace = _extract_cache_namespace()
 
     def _check_dependencies(self):
         """Check available dependencies and configure accordingly"""
-        global HAS_PYMUPDF
+        global HAS_PYMUPDF, HAS_PYPDFIUM2
         self.use_pymupdf = HAS_PYMUPDF
+        self.use_pypdfium2 = HAS_PYPDFIUM2
 
         if HAS_PYMUPDF:
             logger.info("PyMuPDF available - enhanced PDF processing enabled")
         else:
             logger.warning("PyMuPDF not available - using PyPDF2 fallback")
 
-    def extract_text_from_pdf(self, pdf_file) -> str:
-        """Extract text content from PDF file with enhanced extraction methods"""
+        if HAS_PYPDFIUM2:
+            logger.info("pypdfium2 available - PDFium text extraction enabled")
+
+    def extract_text_from_pdf(self, pdf_file, key: Optional[str] = None) -> str:
+        """
+        Extract text content from PDF file with enhanced extraction methods
+
+        key is pdf_file's content_key(), if the caller already has it.
+        """
         logger.info("Starting PDF text extraction...")
 
+        # File-backed PDFs are handed to the parsers by path (see _backing_path),
+        # so none of them needs its own in-memory copy
+        if key is None:
+            key = self.content_key(pdf_file)
+        try:
+            # Re-uploads of the same document skip extraction entirely
+            cache_key = self._cache.key(pdf_file, self._cache_namespace, digest=key)
+            text = self._cache.get(cache_key)
+            if text is not None:
+                return text
+
+            text = self._extract_text_with_fallbacks(pdf_file, key)
+            self._cache.put(cache_key, text)
+            return text
+        finally:
+            # Extraction is the last step for an upload; free its parse now
+            # rather than when it ages out of the cache
+            self._release_parsed(key)
+
+    @contextmanager
+    def _document(self, pdf_file, key: Optional[str]):
+        """
+        Yield a parsed PyMuPDF document for pdf_file, reusing an earlier parse of the same content
+
+        key is pdf_file's content hash; None disables the reuse.
+
+        The document stays owned by the cache - callers must not close it.
+        Use is serialized across threads for as long as the context is held.
+        """
+        with self._cached_parse(self._doc_cache, pdf_file, key, _open_fitz_document) as doc:
+            yield doc
+
+    @contextmanager
+    def _reader(self, pdf_file, key: Optional[str]):
+        """Yield a pypdf/PyPDF2 reader for pdf_file, with the same caching as _document"""
+        with self._cached_parse(self._reader_cache, pdf_file, key, _open_pdf_reader) as reader:
+            yield reader
+
+    @contextmanager
+    def _cached_parse(self, cache: OrderedDict, pdf_file, key: Optional[str], parse):
+        """Look up or create parse(pdf_file) in an LRU cache keyed by content hash"""
+        with self._doc_lock:
+            parsed = cache.get(key) if key else None
+            if parsed is not None:
+                cache.move_to_end(key)
+            else:
+                parsed = parse(pdf_file)
+                if key:
+                    cache[key] = parsed
+                    while len(cache) > _DOC_CACHE_SIZE:
+                        _, evicted = cache.popitem(last=False)
+                        self._close_parsed(evicted)
+            yield parsed
+
+    def _memo_get(self, cache: OrderedDict, key: Optional[str]):
+        """Return a remembered result for key, or None"""
+        if key is None:
+            return None
+        with self._doc_lock:
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+            return result
+
+    def _memo_put(self, cache: OrderedDict, key: Optional[str], result):
+        """Remember a result for key, dropping the least recently used beyond _RESULT_CACHE_SIZE"""
+        if key is None:
+            return
+        with self._doc_lock:
+            cache[key] = result
+            while len(cache) > _RESULT_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def content_key(pdf_file) -> Optional[str]:
+        """
+        Content hash of pdf_file, or None if it cannot be hashed without consuming it
+
+        Callers making several calls for one file can compute this once and
+        pass it as key, instead of each call hashing the whole file again.
+        """
+        try:
+            return hash_source(pdf_file)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _close_parsed(parsed):
+        close = getattr(parsed, 'close', None)
+        if close is not None:
+            close()
+        if HAS_PYMUPDF and isinstance(parsed, fitz.Document):
+            # MuPDF keeps decoded resources in its store until told to shrink it
+            fitz.TOOLS.store_shrink(100)
+
+    def _release_parsed(self, key: Optional[str]):
+        """Close the cached document and reader for content hash key, if any"""
+        if key is None:
+            return
+        with self._doc_lock:
+            for cache in (self._doc_cache, self._reader_cache):
+                parsed = cache.pop(key, None)
+                if parsed is not None:
+                    self._close_parsed(parsed)
+
+    def close_cache(self):
+        """Close cached documents and readers and return MuPDF's object store memory"""
+        with self._doc_lock:
+            for cache in (self._doc_cache, self._reader_cache):
+                while cache:
+                    _, parsed = cache.popitem()
+                    self._close_parsed(parsed)
+            if HAS_PYMUPDF:
+                fitz.TOOLS.store_shrink(100)
+
+    def _extract_text_with_fallbacks(self, pdf_file, key: Optional[str]) -> str:
+        """Try each extraction backend in turn, from best to last resort; key is pdf_file's content hash"""
+        # Scanned PDFs go straight to OCR instead of through every text extractor first
+        ocr_tried = False
+        if self.use_pymupdf and self._looks_scanned(pdf_file, key):
+            ocr_tried = True
+            try:
+                logger.info("No text layer found - attempting OCR extraction first...")
+                ocr_text = self._extract_with_ocr(pdf_file, key)
+                if ocr_text and len(ocr_text.strip()) > 100:
+                    logger.info(f"Successfully extracted {len(ocr_text)} characters using OCR")
+                    return self._post_process_pdf_text(ocr_text, extractor='ocr')
+            except Exception as e:
+                logger.warning(f"OCR extraction failed: {e}, trying text extraction")
+
         # Try PyMuPDF first (better extraction)
         if self.use_pymupdf:
             try:
-                text = self._extract_with_pymupdf(pdf_file)
+                text = self._extract_with_pymupdf(pdf_file, key)
                 if text and len(text.strip()) > 100:  # Ensure we got substantial text
                     logger.info(f"Successfully extracted {len(text)} characters using PyMuPDF")
-                    return self._post_process_pdf_text(text)
+                    return self._post_process_pdf_text(text, extractor='pymupdf')
             except ImportError:
                 logger.warning("PyMuPDF not available, falling back to PyPDF2")
             except Exception as e:
                 logger.warning(f"PyMuPDF extraction failed: {e}, trying PyPDF2")
 
+        # PDFium is much faster than PyPDF2's pure-Python content stream parser
+        if self.use_pypdfium2:
+            try:
+                text = self._extract_with_pypdfium2(pdf_file)
+                if text and len(text.strip()) > 50:
+                    logger.info(f"Successfully extracted {len(text)} characters using pypdfium2")
+                    return self._post_process_pdf_text(text, extractor='pypdfium2')
+            except Exception as e:
+                logger.warning(f"pypdfium2 extraction failed: {e}, trying PyPDF2")
+
         # Fallback to PyPDF2
         if self.fallback_to_pypdf2:
             try:
-                text = self._extract_with_pypdf2(pdf_file)
+                text = self._extract_with_pypdf2(pdf_file, key)
                 if text and len(text.strip()) > 50:
                     logger.info(f"Successfully extracted {len(text)} characters using PyPDF2")
-                    return self._post_process_pdf_text(text)
+                    return self._post_process_pdf_text(text, extractor='pypdf2')
             except Exception as e:
                 logger.error(f"PyPDF2 extraction also failed: {e}")
 
         # Try OCR as last resort for scanned PDFs
-        if self.fallback_to_pypdf2:
+        if self.fallback_to_pypdf2 and not ocr_tried:
             try:
                 logger.info("Attempting OCR extraction for scanned PDF...")
-                ocr_text = self._extract_with_ocr(pdf_file)
+                ocr_text = self._extract_with_ocr(pdf_file, key)
                 if ocr_text and len(ocr_text.strip()) > 100:
                     logger.info(f"Successfully extracted {len(ocr_text)} characters using OCR")
-                    return self._post_process_pdf_text(ocr_text)
+                    return self._post_process_pdf_text(ocr_text, extractor='ocr')
             except Exception as e:
                 logger.warning(f"OCR extraction failed: {e}")
 
         raise Exception("Could not extract readable text from PDF using any available method")
 
-    def _extract_with_pymupdf(self, pdf_file) -> str:
+    def _looks_scanned(self, pdf_file, key: Optional[str]) -> bool:
+        """Whether a PDF has (almost) no text layer, judged from its first few pages"""
+        try:
+            with self._document(pdf_file, key) as doc:
+                return doc.page_count > 0 and not self._check_text_content(doc)
+        except Exception as e:
+            logger.warning(f"Could not sample PDF text layer: {e}")
+            return False
+
+    def _extract_with_pymupdf(self, pdf_file, key: Optional[str]) -> str:
         """Extract text using PyMuPDF (better for complex layouts)"""
         if not HAS_PYMUPDF:
             raise ImportError("PyMuPDF not available")
 
         try:
-
-            # Reset file pointer if needed
-            if hasattr(pdf_file, 'seek'):
-                pdf_file.seek(0)
-
-            doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-
-            if doc.page_count == 0:
-                raise Exception("PDF appears to be empty")
-
-            text_content = []
-            for page_num in range(doc.page_count):
-                try:
-                    page = doc.load_page(page_num)
-                    # Use better extraction method for PyMuPDF
-                    text = page.get_text("text", flags=fitz.TEXT_PRESERVE_WHITESPACE)
-
-                    if text and text.strip():
-                        text_content.append(text)
-                except Exception as e:
-                    logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
-                    continue
-
-            if not text_content:
+            text = None
+            with self._document(pdf_file, key) as doc:
+                total_pages = doc.page_count
+                if total_pages == 0:
+                    raise Exception("PDF appears to be empty")
+                if total_pages <= _PARALLEL_PAGE_THRESHOLD:
+                    text = _join_pages(_fitz_page_text(doc, i) for i in range(total_pages))
+
+            if text is None:
+                # get_text holds the GIL, so pages are spread across processes;
+                # file-backed PDFs are opened by path there rather than shipped as bytes
+                path = _backing_path(pdf_file)
+                page_texts = self._extract_pages_parallel(
+                    path or _read_pdf_bytes(pdf_file), total_pages, _init_fitz_worker, _extract_fitz_page
+                )
+                if page_texts is not None:
+                    text = _join_pages(page_texts)
+                else:
+                    with self._document(pdf_file, key) as doc:
+                        text = _join_pages(_fitz_page_text(doc, i) for i in range(total_pages))
+
+            if not text:
                 raise Exception("No readable text found in PDF")
 
-            return '\n\n'.join(text_content)
+            return text
 
         except ImportError:
             raise ImportError("PyMuPDF (fitz) is not installed")
 
-    def _extract_with_pypdf2(self, pdf_file) -> str:
-        """Extract text using PyPDF2 with enhanced processing"""
-        pdf_reader = None
-        try:
-            # Reset file pointer if needed
-            if hasattr(pdf_file, 'seek'):
-                pdf_file.seek(0)
+    def _extract_with_pypdfium2(self, pdf_file) -> str:
+        """Extract text using pypdfium2 (Google's PDFium C++ library)"""
+        if not HAS_PYPDFIUM2:
+            raise ImportError("pypdfium2 not available")
 
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+        try:
+            # PDFium reads a file-backed PDF itself; only in-memory sources are copied
+            pdf = pdfium.PdfDocument(_backing_path(pdf_file) or _read_pdf_bytes(pdf_file))
+        except pdfium.PdfiumError as e:
+            raise Exception(f"Invalid or corrupted PDF file: {str(e)}")
 
-            if len(pdf_reader.pages) == 0:
+        try:
+            if len(pdf) == 0:
                 raise Exception("PDF appears to be empty or corrupted")
 
-            text_content = []
-            total_pages = len(pdf_reader.pages)
-
-            for i, page in enumerate(pdf_reader.pages):
-                try:
-                    # Enhanced text extraction
-                    text = page.extract_text()
+            text = _join_pages(_pdfium_page_text(pdf, i) for i in range(len(pdf)))
 
-                    # Try alternative extraction if main method fails
-                    if not text or len(text.strip()) < 50:
-                        # Try extracting in sections
-                        text = self._extract_page_sections(page)
+            if not text:
+                raise Exception("No readable text found in PDF")
 
-                    if text and text.strip():
-                        text_content.append(text)
-                except Exception as e:
-                    logger.warning(f"Could not extract text from page {i+1}: {e}")
-                    continue
+            return text
+        finally:
+            pdf.close()
 
-            if not text_content:
+    def _extract_with_pypdf2(self, pdf_file, key: Optional[str]) -> str:
+        """Extract text using PyPDF2 with enhanced processing"""
+        try:
+            text = None
+            with self._reader(pdf_file, key) as pdf_reader:
+                total_pages = len(pdf_reader.pages)
+                if total_pages == 0:
+                    raise Exception("PDF appears to be empty or corrupted")
+                if total_pages <= _PARALLEL_PAGE_THRESHOLD:
+                    text = _join_pages(_extract_page_text(page, i) for i, page in enumerate(pdf_reader.pages))
+
+            if text is None:
+                # Worker processes each parse their own copy, by path when there is one
+                path = _backing_path(pdf_file)
+                page_texts = self._extract_pages_parallel(path or _read_pdf_bytes(pdf_file), total_pages)
+                if page_texts is not None:
+                    text = _join_pages(page_texts)
+                else:
+                    with self._reader(pdf_file, key) as pdf_reader:
+                        text = _join_pages(_extract_page_text(page, i) for i, page in enumerate(pdf_reader.pages))
+
+            if not text:
                 raise Exception("No readable text found in PDF")
 
-            return '\n\n'.join(text_content)
+            return text
 
         except PyPDF2.errors.PdfReadError as e:
             raise Exception(f"Invalid or corrupted PDF file: {str(e)}")
         except Exception as e:
             raise Exception(f"Error processing PDF: {str(e)}")
-        finally:
-            if pdf_reader:
-                try:
-                    pdf_reader.stream.close()
-                except:
-                    pass
 
-    def _extract_page_sections(self, page) -> str:
+    def _extract_pages_parallel(self, data: Union[str, bytes], total_pages: int, initializer=_init_page_worker,
+                                extract_page=_extract_page) -> Optional[List[str]]:
+        """
+        Extract pages across worker processes, in page order; None if the pool fails
+
+        initializer parses data once per worker and extract_page(page_num)
+        returns one page's text; both default to the PyPDF2 workers.
+        """
+        workers = min(os.cpu_count() or 1, -(-total_pages // _PAGES_PER_TASK))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                     initargs=(data,)) as executor:
+                return list(executor.map(extract_page, range(total_pages), chunksize=_PAGES_PER_TASK))
+        except Exception as e:
+            logger.warning(f"Parallel page extraction failed: {e}, extracting pages serially")
+            return None
+
+    @staticmethod
+    def _extract_page_sections(page) -> str:
         """Try to extract text in sections if main extraction fails"""
         try:
             # Try different extraction methods
@@ -186,7 +765,7 @@ class PDFProcessor:
         except:
             return ""
 
-    def _extract_with_ocr(self, pdf_file) -> str:
+    def _extract_with_ocr(self, pdf_file, key: Optional[str]) -> str:
         """Extract text from scanned PDF using OCR"""
         try:
             import fitz
@@ -198,41 +777,52 @@ class PDFProcessor:
             except ImportError:
                 raise Exception("OCR libraries (pytesseract, PIL) not installed")
 
-            # Reset file pointer
-            if hasattr(pdf_file, 'seek'):
-                pdf_file.seek(0)
+            # Render every page first, so MuPDF is released before the slow OCR step
+            images = []
+            with self._document(pdf_file, key) as doc:
+                # Process first few pages for OCR (can be expensive)
+                max_ocr_pages = min(10, doc.page_count)  # Limit OCR to first 10 pages
 
-            doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-            text_content = []
-
-            # Process first few pages for OCR (can be expensive)
-            max_ocr_pages = min(10, doc.page_count)  # Limit OCR to first 10 pages
-
-            for page_num in range(max_ocr_pages):
-                try:
-                    page = doc.load_page(page_num)
-
-                    # Convert page to image
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x scaling for better OCR
-                    img_data = pix.tobytes("png")
+                for page_num in range(max_ocr_pages):
+                    try:
+                        page = doc.load_page(page_num)
 
-                    # Convert to PIL Image
-                    img = Image.open(io.BytesIO(img_data))
+                        # Convert page to a grayscale image - tesseract binarizes anyway
+                        zoom = _OCR_DPI / 72
+                        if page.rect.width * zoom > _OCR_MAX_WIDTH:
+                            zoom = _OCR_MAX_WIDTH / page.rect.width
+                        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
 
-                    # Perform OCR
-                    page_text = pytesseract.image_to_string(img, lang='eng')
+                        # Wrap the raw samples directly - no PNG encode/decode round trip
+                        images.append((page_num, Image.frombytes("L", (pix.width, pix.height), pix.samples)))
+                        pix = None  # Release the pixmap before rendering the next page
 
-                    if page_text and page_text.strip():
-                        text_content.append(f"[Page {page_num + 1}]\n{page_text}")
+                    except Exception as e:
+                        logger.warning(f"OCR failed for page {page_num + 1}: {e}")
+                        continue
 
+            def ocr_page(item):
+                page_num, img = item
+                try:
+                    return page_num, pytesseract.image_to_string(img, lang='eng')
                 except Exception as e:
                     logger.warning(f"OCR failed for page {page_num + 1}: {e}")
-                    continue
-
-            doc.close()
-
-            if text_content:
-                return '\n\n'.join(text_content)
+                    return page_num, ""
+
+            # Each call spawns a tesseract process, so threads are enough to run
+            # several pages at once; map keeps page order
+            workers = max(1, min(_MAX_OCR_WORKERS, os.cpu_count() or 1, len(images)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-ocr") as executor:
+                results = list(executor.map(ocr_page, images))
+
+            text = _join_pages(
+                f"[Page {page_num + 1}]\n{page_text}"
+                for page_num, page_text in results
+                if page_text and page_text.strip()
+            )
+
+            if text:
+                return text
             else:
                 raise Exception("OCR produced no readable text")
 
@@ -243,8 +833,16 @@ class PDFProcessor:
             logger.error(f"OCR extraction failed: {e}")
             raise Exception(f"OCR processing failed: {str(e)}")
 
-    def _post_process_pdf_text(self, text: str) -> str:
-        """Enhanced cleaning and normalization for PDF text with academic content preservation"""
+    def _post_process_pdf_text(self, text: str, extractor: Optional[str] = None) -> str:
+        """
+        Enhanced cleaning and normalization for PDF text with academic content preservation
+
+        Args:
+            text: Raw extracted text
+            extractor: Backend that produced the text ('pymupdf', 'pypdfium2',
+                'pypdf2' or 'ocr'); OCR fixups are skipped for text-layer
+                backends. None applies every fixup.
+        """
         if not text:
             return ""
 
@@ -253,14 +851,11 @@ class PDFProcessor:
         # Step 1: Fix broken words and lines
         text = self._fix_text_extraction_artifacts(text)
 
-        # Step 2: Normalize whitespace while preserving structure
-        text = self._normalize_whitespace(text)
-
-        # Step 3: Handle academic content specific issues
-        text = self._clean_academic_content(text)
+        # Steps 2-3: Normalize whitespace and handle academic content issues
+        text = self._fused_postprocess(text)
 
         # Step 4: Apply enhanced text cleaning
-        text = self._enhanced_text_cleaning(text)
+        text = self._enhanced_text_cleaning(text, ocr_fixups=extractor in (None, 'ocr'))
 
         # Step 5: Validate and ensure quality
         text = self._validate_and_finalize(text)
@@ -270,74 +865,98 @@ class PDFProcessor:
 
     def _fix_text_extraction_artifacts(self, text: str) -> str:
         """Fix common PDF text extraction issues"""
-        # Fix hyphenated words broken across lines
-        text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
+        gate = _PREFILTER.gate()
+
+        fixed = _fix_linebreaks(text)
+        if fixed is not None:
+            text = fixed
+        else:
+            # Fix hyphenated words broken across lines
+            text = gate.sub(_RE_HYPHEN, r'\1\2', text)
 
-        # Fix words broken across lines (but not proper nouns or section headers)
-        text = re.sub(r'(\w)\s*\n\s*(?![A-Z])', r'\1 ', text)
+            # Fix words broken across lines (but not proper nouns or section headers)
+            text = gate.sub(_RE_LINEBREAK, r'\1 ', text)
 
         # Fix broken sentences at line endings
-        text = re.sub(r'([.!?])\s*\n\s*([A-Z])', r'\1\n\2', text)
+        text = gate.sub(_RE_SENTENCE_BREAK, r'\1\n\2', text)
 
         # Fix missing spaces after periods in common abbreviations
-        text = re.sub(r'(\w)\.([A-Z])', r'\1. \2', text)
+        text = gate.sub(_RE_MISSING_SPACE, r'\1. \2', text)
 
         return text
 
-    def _normalize_whitespace(self, text: str) -> str:
-        """Normalize whitespace while preserving document structure"""
-        # Replace multiple spaces with single space
-        text = re.sub(r' +', ' ', text)
-
-        # Normalize paragraph breaks (preserve intentional double newlines)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-
-        # Fix spacing around punctuation
-        text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-        text = re.sub(r'([.,!?;:])\s+', r'\1 ', text)
-
-        # Remove trailing/leading whitespace on lines
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
-        text = '\n'.join(lines)
-
-        return text
-
-    def _clean_academic_content(self, text: str) -> str:
-        """Clean academic-specific content while preserving important information"""
-        # Remove page numbers (but not chapter/section numbers)
-        text = re.sub(r'^\s*-?\s*\d+\s*$', '', text, flags=re.MULTILINE)
+    def _fused_postprocess(self, text: str) -> str:
+        """
+        Normalize whitespace, then clean academic content, with the line-local passes fused
+
+        Space collapsing, line stripping, blank line removal, page number
+        removal and header trimming act on single lines, so they share one
+        sweep instead of five whole-text passes. Output matches the former
+        whole-text page number pass, ^\\s*-?\\s*\\d+\\s*$ (MULTILINE), whose
+        \\s* also crossed the newline after a line holding only "-".
+        """
+        gate = _PREFILTER.gate()
+
+        # These may span line breaks, so they still run over the whole text
+        text = gate.sub(_RE_SPACE_BEFORE_PUNCT, r'\1', text)
+        text = gate.sub(_RE_SPACE_AFTER_PUNCT, r'\1 ', text)
+
+        lines = []
+        for line in text.split('\n'):
+            if '  ' in line:
+                line = _RE_SPACES.sub(' ', line)
+            line = line.strip()
+            if not line:
+                continue
+            if _RE_PAGENUM_LINE.fullmatch(line):
+                if line[0] != '-' and lines and lines[-1] == '-':
+                    # The dash line and this one form a single page number
+                    lines[-1] = ''
+                    continue
+                line = ''  # Page numbers leave an empty line behind
+            else:
+                line = _RE_HEADER.sub('', line)
+            lines.append(line)
 
-        # Remove common headers/footers but preserve section content
-        text = re.sub(r'^.*?(?=Abstract|Introduction|Chapter|Section|Conclusion)',
-                     '', text, flags=re.MULTILINE | re.IGNORECASE)
+        return self._clean_academic_markup('\n'.join(lines), gate)
 
+    def _clean_academic_markup(self, text: str, gate: PrefilterGate) -> str:
+        """Remove citation markers, captions and list markers"""
         # Clean citation markers but preserve the sentence structure
-        text = re.sub(r'\s*\[\d+\]', '', text)  # Remove [1], [2], etc.
-        text = re.sub(r'\s*\(\d{4}\)', '', text)  # Remove (2023)
+        text = gate.sub(_RE_CITATION, '', text)  # Remove [1], [2], etc.
+        text = gate.sub(_RE_YEAR, '', text)  # Remove (2023)
 
         # Remove figure/table captions but preserve context
-        text = re.sub(r'(?:Figure|Fig\.|Table|TABLE)\s*\d+[:.]?\s*.*?(?=\n\n|$)',
-                     '', text, flags=re.IGNORECASE | re.DOTALL)
+        text = gate.sub(_RE_CAPTION, '', text)
 
         # Clean up excessive bullet points or numbering
-        text = re.sub(r'^\s*[\d]+\.?\s*', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^\s*[•●■]\s*', '', text, flags=re.MULTILINE)
+        text = gate.sub(_RE_NUMBERING, '', text)
+        text = gate.sub(_RE_BULLET, '', text)
 
         return text
 
-    def _enhanced_text_cleaning(self, text: str) -> str:
-        """Apply enhanced text cleaning while preserving academic integrity"""
+    def _enhanced_text_cleaning(self, text: str, ocr_fixups: bool = True) -> str:
+        """
+        Apply enhanced text cleaning while preserving academic integrity
+
+        Args:
+            text: Text to clean
+            ocr_fixups: Apply the l -> I and 0 -> O misrecognition fixes; these
+                only make sense for OCR output and corrupt real words otherwise
+        """
+        gate = _PREFILTER.gate()
+
         # Use the existing clean_text function but with PDF-specific enhancements
         text = clean_text(text)
 
         # Additional cleaning for academic content
         # Remove isolated numbers that are likely page remnants
-        text = re.sub(r'(?<!\w)\d+(?!\w)', '', text)
+        text = gate.sub(_RE_ISOLATED_NUMBER, '', text)
 
         # Fix common OCR-like errors in academic text
-        text = re.sub(r'\b(\w+)l\b', r'\1I', text)  # l -> I
-        text = re.sub(r'\b(\w+)0\b', r'\1O', text)  # 0 -> O
+        if ocr_fixups:
+            text = gate.sub(_RE_TRAILING_L, r'\1I', text)  # l -> I
+            text = gate.sub(_RE_TRAILING_ZERO, r'\1O', text)  # 0 -> O
 
         return text
 
@@ -358,8 +977,24 @@ class PDFProcessor:
 
         return text
 
-    def get_pdf_metadata(self, pdf_file) -> Dict[str, Any]:
-        """Extract comprehensive metadata from PDF with enhanced error handling"""
+    def get_pdf_metadata(self, pdf_file, key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract comprehensive metadata from PDF with enhanced error handling
+
+        key is pdf_file's content_key(), if the caller already has it.
+        """
+        # Metadata depends only on the content, so repeat calls skip the parse
+        if key is None:
+            key = self.content_key(pdf_file)
+        metadata = self._memo_get(self._metadata_cache, key)
+        if metadata is None:
+            metadata = self._read_pdf_metadata(pdf_file, key)
+            if metadata['pages'] != 'Unknown':
+                self._memo_put(self._metadata_cache, key, metadata)
+        return dict(metadata)
+
+    def _read_pdf_metadata(self, pdf_file, key: Optional[str]) -> Dict[str, Any]:
+        """Metadata of a PDF; fields that cannot be read stay 'Unknown'"""
         logger.info("Extracting PDF metadata...")
 
         metadata = {
@@ -384,28 +1019,23 @@ class PDFProcessor:
             # Try PyMuPDF first for better metadata
             if self.use_pymupdf:
                 try:
-                    import fitz
-                    if hasattr(pdf_file, 'seek'):
-                        pdf_file.seek(0)
-                    doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-
-                    pdf_metadata = doc.metadata
-                    metadata.update({
-                        'title': pdf_metadata.get('title', 'Unknown') or 'Unknown',
-                        'author': pdf_metadata.get('author', 'Unknown') or 'Unknown',
-                        'creation_date': pdf_metadata.get('creationDate', 'Unknown'),
-                        'producer': pdf_metadata.get('producer', 'Unknown'),
-                        'subject': pdf_metadata.get('subject', 'Unknown'),
-                        'keywords': pdf_metadata.get('keywords', 'Unknown'),
-                        'pages': doc.page_count,
-                        'is_encrypted': doc.is_encrypted,
-                        'language': self._detect_language(pdf_metadata)
-                    })
-
-                    # Check if PDF has extractable text
-                    metadata['has_text'] = self._check_text_content(doc)
-
-                    doc.close()
+                    with self._document(pdf_file, key) as doc:
+                        pdf_metadata = doc.metadata
+                        metadata.update({
+                            'title': pdf_metadata.get('title', 'Unknown') or 'Unknown',
+                            'author': pdf_metadata.get('author', 'Unknown') or 'Unknown',
+                            'creation_date': pdf_metadata.get('creationDate', 'Unknown'),
+                            'producer': pdf_metadata.get('producer', 'Unknown'),
+                            'subject': pdf_metadata.get('subject', 'Unknown'),
+                            'keywords': pdf_metadata.get('keywords', 'Unknown'),
+                            'pages': doc.page_count,
+                            'is_encrypted': doc.is_encrypted,
+                            'language': self._detect_language(pdf_metadata)
+                        })
+
+                        # Check if PDF has extractable text
+                        metadata['has_text'] = self._check_text_content(doc)
+
                     logger.info("Successfully extracted metadata using PyMuPDF")
 
                 except ImportError:
@@ -416,17 +1046,14 @@ class PDFProcessor:
             # Fallback to PyPDF2
             if metadata['pages'] == 'Unknown':
                 try:
-                    if hasattr(pdf_file, 'seek'):
-                        pdf_file.seek(0)
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-
-                    pdf_metadata = pdf_reader.metadata
-                    metadata.update({
-                        'title': pdf_metadata.get('/Title', 'Unknown') or 'Unknown',
-                        'author': pdf_metadata.get('/Author', 'Unknown') or 'Unknown',
-                        'pages': len(pdf_reader.pages),
-                        'is_encrypted': pdf_reader.is_encrypted,
-                    })
+                    with self._reader(pdf_file, key) as pdf_reader:
+                        pdf_metadata = pdf_reader.metadata
+                        metadata.update({
+                            'title': pdf_metadata.get('/Title', 'Unknown') or 'Unknown',
+                            'author': pdf_metadata.get('/Author', 'Unknown') or 'Unknown',
+                            'pages': len(pdf_reader.pages),
+                            'is_encrypted': pdf_reader.is_encrypted,
+                        })
 
                     logger.info("Extracted metadata using PyPDF2 fallback")
 
@@ -465,27 +1092,43 @@ class PDFProcessor:
     def _check_text_content(self, doc) -> bool:
         """Check if PDF contains extractable text content"""
         try:
-            # Try to extract text from first few pages
+            # Try to extract text from first few pages, stopping at the first text-rich one
             for i in range(min(3, doc.page_count)):
                 page = doc.load_page(i)
-                text = page.get_text("text").strip()
-                if len(text) > 100:  # Substantial text found
+                text = page.get_text("text")
+                # strip() can only shorten it, so short pages skip the copy
+                if len(text) > 100 and len(text.strip()) > 100:  # Substantial text found
                     return True
             return False
         except:
             return False
 
-    def validate_pdf(self, pdf_file) -> tuple[bool, str]:
-        """Comprehensive PDF validation with detailed error reporting"""
+    def validate_pdf(self, pdf_file, key: Optional[str] = None) -> tuple[bool, str]:
+        """
+        Comprehensive PDF validation with detailed error reporting
+
+        key is pdf_file's content_key(), if the caller already has it.
+        """
+        # Step 1: Check file extension
+        if hasattr(pdf_file, 'filename'):
+            filename = pdf_file.filename.lower()
+            if not filename.endswith('.pdf'):
+                return False, "File must have .pdf extension"
+
+        # The remaining checks depend only on the content, so repeat calls skip them
+        if key is None:
+            key = self.content_key(pdf_file)
+        result = self._memo_get(self._validation_cache, key)
+        if result is None:
+            result = self._validate_pdf_content(pdf_file, key)
+            self._memo_put(self._validation_cache, key, result)
+        return result
+
+    def _validate_pdf_content(self, pdf_file, key: Optional[str]) -> tuple[bool, str]:
+        """Validate a PDF's size and structure"""
         logger.info("Starting PDF validation...")
 
         try:
-            # Step 1: Check file extension
-            if hasattr(pdf_file, 'filename'):
-                filename = pdf_file.filename.lower()
-                if not filename.endswith('.pdf'):
-                    return False, "File must have .pdf extension"
-
             # Step 2: Check file size (basic validation)
             if hasattr(pdf_file, 'seek') and hasattr(pdf_file, 'tell'):
                 current_pos = pdf_file.tell()
@@ -506,22 +1149,15 @@ class PDFProcessor:
                 # Try PyMuPDF first
                 if self.use_pymupdf:
                     try:
-                        import fitz
-                        if hasattr(pdf_file, 'seek'):
-                            pdf_file.seek(0)
-                        doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-
-                        if doc.page_count == 0:
-                            doc.close()
-                            return False, "PDF contains no pages"
+                        with self._document(pdf_file, key) as doc:
+                            if doc.page_count == 0:
+                                return False, "PDF contains no pages"
 
-                        # Check if PDF is encrypted
-                        if doc.is_encrypted:
-                            doc.close()
-                            return False, "PDF is password-protected"
+                            # Check if PDF is encrypted
+                            if doc.is_encrypted:
+                                return False, "PDF is password-protected"
 
-                        doc.close()
-                        return True, f"Valid PDF with {doc.page_count} pages"
+                            return True, f"Valid PDF with {doc.page_count} pages"
 
                     except ImportError:
                         pass
@@ -529,17 +1165,14 @@ class PDFProcessor:
                         logger.warning(f"PyMuPDF validation failed: {e}")
 
                 # Fallback to PyPDF2
-                if hasattr(pdf_file, 'seek'):
-                    pdf_file.seek(0)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
+                with self._reader(pdf_file, key) as pdf_reader:
+                    if len(pdf_reader.pages) == 0:
+                        return False, "PDF contains no pages"
 
-                if len(pdf_reader.pages) == 0:
-                    return False, "PDF contains no pages"
+                    if pdf_reader.is_encrypted:
+                        return False, "PDF is password-protected"
 
-                if pdf_reader.is_encrypted:
-                    return False, "PDF is password-protected"
-
-                return True, f"Valid PDF with {len(pdf_reader.pages)} pages"
+                    return True, f"Valid PDF with {len(pdf_reader.pages)} pages"
 
             except PyPDF2.errors.PdfReadError as e:
                 return False, f"PDF file is corrupted or invalid: {str(e)}"
@@ -600,4 +1233,11 @@ class PDFProcessor:
             diagnosis['issues'].append(f"Metadata extraction failed: {str(e)}")
 
         diagnosis['is_valid'] = len(diagnosis['issues']) == 0
-        return diagnosis
\ No newline at end of file
+        return diagnosis
+
+
+# Shared instance, reused instead of re-running dependency checks per request.
+# Its per-document caches (parsed documents, validation results, metadata) are
+# size-bounded and guarded by _doc_lock, and the on-disk extraction cache
+# writes atomically, so it is safe to share across threads
+pdf_processor = PDFProcessor()
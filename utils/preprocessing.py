@@ -1,67 +1,234 @@
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import sent_tokenize, word_tokenize
+import logging
 import string
+from collections import Counter
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List
+from .regex_prefilter import RegexPrefilter
 
-# Robust NLTK setup with fallback handling
+logger = logging.getLogger(__name__)
+
+# Optional: spaCy's Cython pipeline for preprocessing many documents at once
+try:
+    import spacy
+    HAS_SPACY = True
+except ImportError:
+    HAS_SPACY = False
+
+# Optional: RE2's DFA for the case-insensitive caption scan, the slowest pass here
 try:
-    # Try to download NLTK data
-    nltk.download('stopwords', quiet=True, force=False)
-    nltk.download('wordnet', quiet=True, force=False)
-    nltk.download('punkt', quiet=True, force=False)
-except Exception as e:
-    print(f"NLTK download warning: {e}")
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
+
+_SPACY_MODEL = 'en_core_web_sm'
+_SPACY_BATCH_SIZE = 64
+
+# NLTK's English stopword list, used when the corpus cannot be downloaded
+_FALLBACK_STOPWORDS = """
+    i me my myself we our ours ourselves you you're you've you'll you'd your yours
+    yourself yourselves he him his himself she she's her hers herself it it's its itself
+    they them their theirs themselves what which who whom this that that'll these those
+    am is are was were be been being have has had having do does did doing a an the and
+    but if or because as until while of at by for with about against between into
+    through during before after above below to from up down in out on off over under
+    again further then once here there when where why how all any both each few more
+    most other some such no nor not only own same so than too very s t can will just don
+    don't should should've now d ll m o re ve y ain aren aren't couldn couldn't didn
+    didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn
+    mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren
+    weren't won won't wouldn wouldn't
+""".split()
+
+# NLTK is imported, and its data fetched, on first use: cleaning and
+# summarization preprocessing never touch it, so they skip the import and the
+# network round trips of the downloads
+@lru_cache(maxsize=1)
+def _nltk():
+    """Import NLTK and download the data this module uses, once"""
+    import nltk
+
+    # Robust NLTK setup with fallback handling
     try:
-        # Fallback: try to use existing data
-        from nltk.corpus import stopwords
-        from nltk.stem import WordNetLemmatizer
-        from nltk.tokenize import sent_tokenize, word_tokenize
+        # Try to download NLTK data
+        nltk.download('stopwords', quiet=True, force=False)
+        nltk.download('wordnet', quiet=True, force=False)
+        nltk.download('punkt', quiet=True, force=False)
+    except Exception as e:
+        # Fall back to existing data; anything still missing raises LookupError
+        # where it is used, which _stopwords_en, _lemmatizer and
+        # segment_sentences each fall back from
+        print(f"NLTK download warning: {e}")
         print("Using existing NLTK data")
-    except:
-        print("NLTK data not available, using basic fallbacks")
-        # Define minimal fallbacks
-        import re
-        def sent_tokenize(text):
-            return re.split(r'[.!?]+', text)
-        def word_tokenize(text):
-            return text.split()
+    return nltk
+
+@lru_cache(maxsize=1)
+def _stopwords_en() -> FrozenSet[str]:
+    """
+    English stopwords, loaded once rather than re-read from the corpus per call
+
+    Membership is tested once per token, so this must stay a hashed set
+    whichever source it comes from - a list makes filtering O(n*m).
+    """
+    try:
+        return frozenset(_nltk().corpus.stopwords.words('english'))
+    except LookupError:
+        return frozenset(_FALLBACK_STOPWORDS)
+
+@lru_cache(maxsize=1)
+def _lemmatizer():
+    """Shared WordNetLemmatizer, created on first use; None if the WordNet data is missing"""
+    lemmatizer = _nltk().stem.WordNetLemmatizer()
+    try:
+        # WordNet loads lazily on first lookup; pay that cost here, not mid-document
+        lemmatizer.lemmatize('a')
+    except LookupError as e:
+        logger.warning(f"WordNet data not available, leaving words unlemmatized: {e}")
+        return None
+    return lemmatizer
+
+@lru_cache(maxsize=100_000)
+def _lemmatize(word):
+    """Memoised WordNet lookup; token frequencies are Zipfian, so most calls hit"""
+    lemmatizer = _lemmatizer()
+    if lemmatizer is None:
+        return word
+    return lemmatizer.lemmatize(word)
+
+# Cleaning patterns, compiled once instead of looked up in re's cache per call
+# clean_ocr_text: common OCR misrecognitions, all fixed in a single pass
+_OCR_FIXES = {
+    '1': 'I',  # 1 -> I
+    '0': 'O',  # 0 -> O
+    'l': 'I',  # l -> I
+    '|': 'I',  # | -> I
+    '@': 'a',  # @ -> a
+    '&': 'et',  # & -> et
+    '$': 'S',  # $ -> S
+}
+_RE_OCR_CHAR = re.compile(r'\b[10l|@&$]\b')
+_RE_PAGENUM = re.compile(r'\n\s*\d+\s*\n')
+_RE_HEADER = re.compile(r'^.*?(?=Abstract|Introduction|Chapter|Section)', re.MULTILINE | re.IGNORECASE)
+_HEADER_KEYWORDS = ('abstract', 'introduction', 'chapter', 'section')
+_RE_CITATION = re.compile(r'\[\d+\]')
+_RE_ET_AL = re.compile(r'\(\w+ et al\., \d{4}\)')
+_RE_CAPTION = re.compile(r'(Figure|Table|Fig\.)\s*\d+.*?\n', re.IGNORECASE)
+_CAPTION_KEYWORDS = ('fig', 'table')
+# RE2 form of _RE_CAPTION for ASCII text. RE2's \s lacks \v and \x1c-\x1f, so
+# they are spelt out; its \d and case folding match re's on ASCII input.
+_RE2_CAPTION = re2.compile(r'(?i)(Figure|Table|Fig\.)[\t\n\x0b\x0c\r\x1c-\x1f ]*\d+.*?\n') if HAS_RE2 else None
+# normalize_whitespace
+_RE_SPACES = re.compile(r' +')
+_RE_BLANK_LINES = re.compile(r'\n\s*\n\s*\n+')
+# clean_text / preprocess_for_summarization
+_RE_SPECIAL_CHARS = re.compile(r'[^a-zA-Z\s\.\!\?\,\;\:\-\'\"]')
+_RE_SUMMARY_SPECIAL_CHARS = re.compile(r'[^a-zA-Z\s\.\!\?\,\;\:\-\'\"\%\&\(\)\[\]\{\}\+\=\*\/]')
+# The same strips as str.translate tables for ASCII text
+_SPECIAL_CHARS_TABLE = {code: None for code in range(128) if _RE_SPECIAL_CHARS.match(chr(code))}
+_SUMMARY_SPECIAL_CHARS_TABLE = {code: None for code in range(128) if _RE_SUMMARY_SPECIAL_CHARS.match(chr(code))}
+_RE_SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,!?;:])')
+# Only whitespace runs that are not already a single space need rewriting, so
+# the usual '. ' fails the lookahead instead of being replaced by itself
+_RE_SPACE_AFTER_PUNCT = re.compile(r'([.,!?;:])(?! (?!\s))\s+')
+_RE_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+# Sentence break followed by a lowercase letter, once punctuation spacing is
+# normalised; the leading literal lets re skip ahead instead of testing every
+# position, so the first sentence of the text is handled separately
+_RE_SENTENCE_START = re.compile(r'\. [a-z]')
+_RE_SUMMARY_SENTENCE_START = re.compile(r'[.!?] [a-z]')
+# segment_sentences: abbreviations common in academic writing, masked in one pass
+_ABBREVIATIONS = ['et al.', 'i.e.', 'e.g.', 'cf.', 'vs.', 'etc.', 'Dr.', 'Prof.', 'Fig.', 'Table', 'Eq.']
+_RE_ABBREVIATION = re.compile('|'.join(re.escape(abbr) for abbr in _ABBREVIATIONS if '.' in abbr))
+# preprocess_text / extract_keywords: words, keeping inner apostrophes and hyphens
+_RE_WORD = re.compile(r"[A-Za-z]+(?:['-][A-Za-z]+)*")
+
+# Passes that rarely match real text: ruled out by a character check or one
+# Hyperscan scan instead of each running its own regex pass
+_PREFILTER = RegexPrefilter(
+    (_RE_OCR_CHAR, _RE_PAGENUM, _RE_HEADER, _RE_CITATION, _RE_ET_AL, _RE_CAPTION,
+     _RE_BLANK_LINES, _RE_SPACE_BEFORE_PUNCT),
+    required_chars={
+        _RE_OCR_CHAR: 'l10|@&$',
+        _RE_PAGENUM: '\n',
+        _RE_CITATION: '[',
+        _RE_ET_AL: '(',
+        _RE_CAPTION: '\n',
+        _RE_BLANK_LINES: '\n',
+    },
+    name='text cleaning',
+)
+
+def _upper_match(match):
+    return match.group().upper()
+
+def _capitalize_sentences(text, pattern):
+    """Uppercase the first letter of the text and of every sentence matched by pattern"""
+    text = pattern.sub(_upper_match, text)
+    if 'a' <= text[:1] <= 'z':
+        text = text[0].upper() + text[1:]
+    return text
+
+def _contains_keyword(text, keywords):
+    """
+    Case-insensitive test for any of keywords in text
+
+    Only exact for ASCII, where lower() agrees with re.IGNORECASE; other text
+    always reports True so the regex still runs.
+    """
+    if not text.isascii():
+        return True
+    lowered = text.lower()
+    return any(keyword in lowered for keyword in keywords)
+
+def _strip_chars(text, pattern, table):
+    """Delete the characters a single-character pattern matches"""
+    # str.translate is one C loop over a lookup table, far faster than the
+    # regex on ASCII; its generic path for other text is slower, so the regex
+    # stays there
+    if text.isascii():
+        return text.translate(table)
+    return pattern.sub('', text)
+
+def _fix_ocr_char(match):
+    return _OCR_FIXES[match.group()]
+
+def _mask_abbreviation(match):
+    return match.group().replace('.', '###')
 
 def clean_ocr_text(text):
     """Handle common OCR errors and noise in educational documents"""
+    gate = _PREFILTER.gate()
+
     # Fix common OCR misrecognitions
-    ocr_fixes = {
-        r'\b1\b': 'I',  # 1 -> I
-        r'\b0\b': 'O',  # 0 -> O
-        r'\bl\b': 'I',  # l -> I
-        r'\b\|\b': 'I',  # | -> I
-        r'\b@\b': 'a',  # @ -> a
-        r'\b&\b': 'et',  # & -> et
-        r'\b\$\b': 'S',  # $ -> S
-    }
-    for pattern, replacement in ocr_fixes.items():
-        text = re.sub(pattern, replacement, text)
+    text = gate.sub(_RE_OCR_CHAR, _fix_ocr_char, text)
 
     # Remove page numbers, headers, footers (common in PDFs)
-    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)  # Page numbers
-    text = re.sub(r'^.*?(?=Abstract|Introduction|Chapter|Section)', '', text, flags=re.MULTILINE | re.IGNORECASE)  # Remove headers
+    text = gate.sub(_RE_PAGENUM, '\n', text)  # Page numbers
+    if _contains_keyword(text, _HEADER_KEYWORDS):
+        text = gate.sub(_RE_HEADER, '', text)  # Remove headers
 
     # Remove citations and references
-    text = re.sub(r'\[\d+\]', '', text)  # [1], [2], etc.
-    text = re.sub(r'\(\w+ et al\., \d{4}\)', '', text)  # (Smith et al., 2020)
+    text = gate.sub(_RE_CITATION, '', text)  # [1], [2], etc.
+    text = gate.sub(_RE_ET_AL, '', text)  # (Smith et al., 2020)
 
     # Remove figure/table captions
-    text = re.sub(r'(Figure|Table|Fig\.)\s*\d+.*?\n', '', text, flags=re.IGNORECASE)
+    if _contains_keyword(text, _CAPTION_KEYWORDS) and gate.may_match(_RE_CAPTION, text):
+        if _RE2_CAPTION is not None and text.isascii():
+            text = _RE2_CAPTION.sub('', text)
+        else:
+            text = _RE_CAPTION.sub('', text)
 
     return text
 
 def normalize_whitespace(text):
     """Normalize whitespace and line breaks"""
     # Replace multiple spaces with single space
-    text = re.sub(r' +', ' ', text)
+    if '  ' in text:
+        text = _RE_SPACES.sub(' ', text)
     # Replace multiple newlines with double newline (paragraph breaks)
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = _PREFILTER.gate().sub(_RE_BLANK_LINES, '\n\n', text)
     # Remove leading/trailing whitespace
     text = text.strip()
     return text
@@ -72,87 +239,119 @@ def clean_text(text):
     text = normalize_whitespace(text)
 
     # Remove remaining special characters but keep sentence punctuation and preserve case
-    text = re.sub(r'[^a-zA-Z\s\.\!\?\,\;\:\-\'\"]', '', text)
+    text = _strip_chars(text, _RE_SPECIAL_CHARS, _SPECIAL_CHARS_TABLE)
 
     # Fix spacing around punctuation
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    text = re.sub(r'([.,!?;:])\s+', r'\1 ', text)
+    text = _PREFILTER.gate().sub(_RE_SPACE_BEFORE_PUNCT, r'\1', text)
+    text = _RE_SPACE_AFTER_PUNCT.sub(r'\1 ', text)
 
     # Preserve capitalization for proper nouns and sentence starts
     # Only convert to lowercase if it's clearly not a proper noun
-    sentences = text.split('. ')
-    processed_sentences = []
-
-    for sentence in sentences:
-        if sentence.strip():
-            # Capitalize first letter of each sentence
-            sentence = sentence.strip()
-            if sentence:
-                sentence = sentence[0].upper() + sentence[1:]
-            processed_sentences.append(sentence)
-
-    text = '. '.join(processed_sentences)
+    # Sentences are now separated by exactly '. '; drop a dangling separator at
+    # either end, then capitalize each sentence's first letter in one pass
+    if text.endswith('. '):
+        text = text[:-2]
+    text = text.strip()
+    if text.startswith('. '):
+        text = text[2:]
+    text = _capitalize_sentences(text, _RE_SENTENCE_START)
 
     return text
 
 def segment_sentences(text):
     """Improved sentence segmentation for academic text with robust fallback"""
     # First try the simple regex-based approach as primary method
-    import re
-
     # Handle abbreviations common in academic writing
-    abbreviations = ['et al.', 'i.e.', 'e.g.', 'cf.', 'vs.', 'etc.', 'Dr.', 'Prof.', 'Fig.', 'Table', 'Eq.']
-    temp_text = text
-    for abbr in abbreviations:
-        temp_text = temp_text.replace(abbr, abbr.replace('.', '###'))
+    temp_text = _RE_ABBREVIATION.sub(_mask_abbreviation, text)
 
     # Simple sentence splitting based on periods, exclamation marks, and question marks
-    sentences = re.split(r'(?<=[.!?])\s+', temp_text.strip())
+    sentences = _RE_SENTENCE_SPLIT.split(temp_text.strip())
 
-    # Restore periods in abbreviations and filter
-    processed_sentences = []
-    for sent in sentences:
-        sent = sent.replace('###', '.').strip()
-        # Filter out very short sentences that might be artifacts
-        if len(sent) > 10 and not sent.isspace():
-            processed_sentences.append(sent)
+    # Restore periods in abbreviations and filter out very short sentences
+    # that might be artifacts, in one pass over the split
+    processed_sentences = [sent for sent in (piece.replace('###', '.').strip() for piece in sentences)
+                           if len(sent) > 10]
 
     # If we got reasonable sentences, return them
-    if processed_sentences and len(processed_sentences) <= len(sentences) * 1.5:
+    if processed_sentences:
         return processed_sentences
 
     # Fallback: try NLTK if regex didn't work well
     try:
-        from nltk.tokenize import sent_tokenize
-        nltk_sentences = sent_tokenize(text)
+        nltk_sentences = _nltk().sent_tokenize(text)
         if nltk_sentences:
             return nltk_sentences
-    except (LookupError, ImportError):
+    except LookupError:
         pass
 
     # Final fallback: return the whole text as one sentence
     return [text.strip()] if text.strip() else []
 
+# preprocess_text, specialised per option combination so no flag is checked
+# per token. Only word tokens matter for filtering and lemmatizing, so one
+# regex scan replaces NLTK's Punkt + Treebank pipeline.
+def _filter_and_lemmatize(text):
+    words = _RE_WORD.findall(clean_text(text))
+    stop_words = _stopwords_en()
+    return ' '.join([_lemmatize(word) for word in words if word.lower() not in stop_words])
+
+def _filter_stopwords(text):
+    words = _RE_WORD.findall(clean_text(text))
+    stop_words = _stopwords_en()
+    return ' '.join([word for word in words if word.lower() not in stop_words])
+
+def _lemmatize_words(text):
+    words = _RE_WORD.findall(clean_text(text))
+    return ' '.join([_lemmatize(word) for word in words])
+
+_PREPROCESSORS = {
+    (True, True): _filter_and_lemmatize,
+    (True, False): _filter_stopwords,
+    (False, True): _lemmatize_words,
+    (False, False): clean_text,
+}
+
 def preprocess_text(text, remove_stopwords=True, lemmatize=True):
     """Enhanced preprocessing with options"""
-    text = clean_text(text)
-
-    if remove_stopwords or lemmatize:
-        words = word_tokenize(text)
-        stop_words = set(stopwords.words('english')) if remove_stopwords else set()
-        lemmatizer = WordNetLemmatizer() if lemmatize else None
+    return _PREPROCESSORS[bool(remove_stopwords), bool(lemmatize)](text)
 
-        processed_words = []
-        for word in words:
-            if remove_stopwords and word.lower() in stop_words:
-                continue
-            if lemmatize:
-                word = lemmatizer.lemmatize(word)
-            processed_words.append(word)
-
-        return ' '.join(processed_words)
-    else:
-        return text
+@lru_cache(maxsize=1)
+def _spacy_pipeline():
+    """Load the spaCy model once, or return None if it is unavailable"""
+    if not HAS_SPACY:
+        return None
+    try:
+        # The lemmatizer needs the tagger's POS tags; NER and parsing are unused
+        return spacy.load(_SPACY_MODEL, disable=['ner', 'parser'])
+    except OSError as e:
+        logger.warning(f"spaCy model {_SPACY_MODEL} not available, using NLTK preprocessing: {e}")
+        return None
+
+def preprocess_batch(texts: Iterable[str], remove_stopwords=True, lemmatize=True) -> List[str]:
+    """
+    Preprocess many documents at once, like preprocess_text on each
+
+    With spaCy installed the documents are tokenized and lemmatized in
+    batches across all cores; otherwise each goes through preprocess_text.
+    Stopwords come from the same list in both cases.
+    """
+    texts = list(texts)
+    nlp = _spacy_pipeline() if (remove_stopwords or lemmatize) else None
+    if nlp is None:
+        return [preprocess_text(text, remove_stopwords, lemmatize) for text in texts]
+
+    # Worker processes only pay for themselves beyond a single batch
+    n_process = (os.cpu_count() or 1) if len(texts) > _SPACY_BATCH_SIZE else 1
+    cleaned = (clean_text(text) for text in texts)
+
+    results = []
+    for doc in nlp.pipe(cleaned, batch_size=_SPACY_BATCH_SIZE, n_process=n_process):
+        words = [token for token in doc if not (token.is_punct or token.is_space)]
+        if remove_stopwords:
+            stop_words = _stopwords_en()
+            words = [token for token in words if token.lower_ not in stop_words]
+        results.append(' '.join(token.lemma_ if lemmatize else token.text for token in words))
+    return results
 
 def preprocess_for_summarization(text):
     """Specialized preprocessing for summarization that preserves important context"""
@@ -161,34 +360,23 @@ def preprocess_for_summarization(text):
     text = normalize_whitespace(text)
 
     # Remove only problematic special characters, keep most punctuation
-    text = re.sub(r'[^a-zA-Z\s\.\!\?\,\;\:\-\'\"\%\&\(\)\[\]\{\}\+\=\*\/]', '', text)
+    text = _strip_chars(text, _RE_SUMMARY_SPECIAL_CHARS, _SUMMARY_SPECIAL_CHARS_TABLE)
 
     # Fix spacing around punctuation
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    text = re.sub(r'([.,!?;:])\s+', r'\1 ', text)
-
-    # Preserve sentence structure and capitalization
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-    processed_sentences = []
+    text = _PREFILTER.gate().sub(_RE_SPACE_BEFORE_PUNCT, r'\1', text)
+    text = _RE_SPACE_AFTER_PUNCT.sub(r'\1 ', text)
 
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence:
-            # Capitalize first letter
-            sentence = sentence[0].upper() + sentence[1:] if sentence else sentence
-            processed_sentences.append(sentence)
-
-    return ' '.join(processed_sentences)
+    # Preserve sentence structure and capitalization; sentence breaks are
+    # already single spaces, so capitalize in place rather than split and rejoin
+    return _capitalize_sentences(text.strip(), _RE_SUMMARY_SENTENCE_START)
 
 def extract_keywords(text, top_n=10):
     """Extract important keywords from text for constrained decoding"""
-    words = word_tokenize(text.lower())
-    stop_words = set(stopwords.words('english'))
-    words = [word for word in words if word not in stop_words and len(word) > 2]
-
-    # Simple frequency-based keyword extraction
-    from collections import Counter
-    word_freq = Counter(words)
+    # Simple frequency-based keyword extraction, counted straight from the
+    # token stream without building intermediate word lists
+    stop_words = _stopwords_en()
+    word_freq = Counter(word for word in _RE_WORD.findall(text.lower())
+                        if len(word) > 2 and word not in stop_words)
     keywords = [word for word, _ in word_freq.most_common(top_n)]
 
-    return keywords
\ No newline at end of file
+    return keywords
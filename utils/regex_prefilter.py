@@ -0,0 +1,137 @@
+import re
+import logging
+import threading
+from typing import Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Optional: Hyperscan prefilter that lets regex pipelines skip passes
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+# Python's \s also matches the ASCII separators \x1c-\x1f, Hyperscan's does
+# not; scanning them as spaces keeps the scan's matches a superset
+_SEPARATORS_AS_SPACES = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+
+
+def _build_prefilter_database(patterns):
+    """
+    Compile the patterns into one Hyperscan database in prefilter mode
+
+    Prefilter mode approximates what Hyperscan cannot run exactly (lookarounds,
+    backreferences) so it reports a superset of the real matches: a pattern it
+    does not report cannot match. Patterns Hyperscan rejects stay ungated.
+    Returns (database, {pattern: id}).
+    """
+    base_flags = (hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP |
+                  hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY)
+    expressions, ids, flags = [], [], []
+    for pattern_id, pattern in enumerate(patterns):
+        hs_flags = base_flags
+        if pattern.flags & re.IGNORECASE:
+            hs_flags |= hyperscan.HS_FLAG_CASELESS
+        if pattern.flags & re.MULTILINE:
+            hs_flags |= hyperscan.HS_FLAG_MULTILINE
+        if pattern.flags & re.DOTALL:
+            hs_flags |= hyperscan.HS_FLAG_DOTALL
+        expression = pattern.pattern.encode('utf-8')
+        try:
+            hyperscan.Database().compile(expressions=[expression], ids=[pattern_id], flags=[hs_flags])
+        except Exception:
+            continue
+        expressions.append(expression)
+        ids.append(pattern_id)
+        flags.append(hs_flags)
+
+    if not expressions:
+        return None, {}
+    database = hyperscan.Database()
+    database.compile(expressions=expressions, ids=ids, flags=flags)
+    return database, {patterns[pattern_id]: pattern_id for pattern_id in ids}
+
+
+class RegexPrefilter:
+    """
+    Cheap tests that rule out regex passes before they run
+
+    A pattern is skipped when none of its required characters occur in the
+    text (a C-level substring scan), or when a single Hyperscan pass over
+    ASCII text shows it cannot match.
+    """
+
+    def __init__(self, patterns: Sequence, required_chars: Optional[Dict] = None, name: str = 'regex'):
+        """
+        Args:
+            patterns: Compiled patterns to gate with Hyperscan
+            required_chars: {pattern: chars}, at least one of which must occur
+                in the text for the pattern to match
+            name: Label for log messages
+        """
+        self.required_chars = required_chars or {}
+        self.database, self.pattern_ids = None, {}
+        if HAS_HYPERSCAN:
+            try:
+                self.database, self.pattern_ids = _build_prefilter_database(tuple(patterns))
+                logger.info(f"Hyperscan prefilter enabled for {len(self.pattern_ids)} {name} patterns")
+            except Exception as e:
+                logger.warning(f"Hyperscan prefilter unavailable: {e}")
+        # The database's scratch space is not safe for concurrent scans
+        self._scan_lock = threading.Lock()
+
+    def scan(self, text: str) -> frozenset:
+        """Return the ids of gated patterns that may match text, in one Hyperscan pass"""
+        gated = len(self.pattern_ids)
+        if not text.isascii():
+            # Hyperscan's Unicode tables are older than Python's, so \w, \d and
+            # \b disagree on newer characters; only ASCII text can be ruled out
+            return frozenset(self.pattern_ids.values())
+        hits = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
+            # Nothing left to learn once every pattern has matched; stop scanning
+            return len(hits) == gated
+
+        with self._scan_lock:
+            try:
+                self.database.scan(text.encode('ascii').translate(_SEPARATORS_AS_SPACES),
+                                   match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass  # on_match stopped the scan; hits is already complete
+        return frozenset(hits)
+
+    def gate(self) -> 'PrefilterGate':
+        """Start a gate for one sequence of passes over a text"""
+        return PrefilterGate(self)
+
+
+class PrefilterGate:
+    """Runs compiled-regex passes, skipping those a character check or Hyperscan prefilter scan rules out"""
+
+    def __init__(self, prefilter: RegexPrefilter):
+        self._prefilter = prefilter
+        self._text = None
+        self._hits = frozenset()
+
+    def may_match(self, pattern, text: str) -> bool:
+        """False only if pattern certainly has no match in text"""
+        required = self._prefilter.required_chars.get(pattern)
+        if required is not None and not any(char in text for char in required):
+            return False
+        pattern_id = self._prefilter.pattern_ids.get(pattern)
+        if pattern_id is not None:
+            # re.sub returns its input unchanged when nothing matched, so the
+            # scan is only repeated after a pass actually rewrote the text
+            if text is not self._text:
+                self._hits = self._prefilter.scan(text)
+                self._text = text
+            return pattern_id in self._hits
+        return True
+
+    def sub(self, pattern, repl, text: str) -> str:
+        if not self.may_match(pattern, text):
+            return text
+        return pattern.sub(repl, text)